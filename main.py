@@ -1,15 +1,33 @@
+import time
+
+# The fallback start for the startup measurement where the OS does not report when the process was created
+STARTED_AT = time.perf_counter()
+
 import sys
 import os
-import re
+import json
+import shutil
 import logging
-import sqlite3
+from collections import deque
+
 from PyQt5 import QtGui
-from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, QPushButton, QLineEdit,
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit,
                              QFileDialog, QMessageBox, QComboBox, QLabel, QMenuBar, QAction, QDialog, QCheckBox,
-                             QPlainTextEdit, QListWidget, QListWidgetItem, QTabWidget, QProgressBar,
-                             QSystemTrayIcon, QMenu)
-from PyQt5.QtCore import Qt, QTimer, QUrl, QThread, pyqtSignal
-from PyQt5.QtGui import QDesktopServices, QIcon
+                             QPlainTextEdit, QTreeView, QHeaderView, QTabWidget, QProgressBar,
+                             QSystemTrayIcon, QMenu, QListWidget, QListWidgetItem)
+from PyQt5.QtCore import Qt, QTimer, QUrl, QThread, QObject, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QDesktopServices, QIcon, QTextCursor
+from parse_engine import ParseReverseEngine, detect_delimiters, parse_marker_spec, format_marker_spec, stripped_text
+from parse_writer import reverse_parse_to_disk, diff_to_disk, file_diff
+from parse_queue import ParseReverseCoalescingQueue
+from parse_logging import LOG_FORMAT, LOG_LEVELS, configured_level, configured_max_lines, start_file_sink
+from parse_db import ParseReverseDatabase, load_parsed_item, has_history_index, history_index_ready
+from parse_bundler import ParseReverseBundler, ParseReverseBundleIndex, DEFAULT_EXCLUDES, parse_globs
+from parse_watch import ParseReverseFolderWatcher
+from parse_index import ParseReverseIndexedBundle, write_indexed_bundle, INDEXED_EXTENSION
+from parse_metrics import ParseReverseMetrics, format_metrics, export_runs, profiled, record_run, process_age
+from parse_spill import ParseReverseSpill, configured_memory_budget, exceeds_budget, PREVIEW_CHARS
+from parse_history import search_history, run_entries, restore_files, HISTORY_PAGE_SIZE
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -17,52 +35,742 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 class ParseReverseQTextEditLogger(logging.Handler):
-    def __init__(self, text_edit):
+    """
+    Log handler that is safe to call from any thread: records are queued and a GUI-side timer appends them
+    in batches. The widget keeps at most max_lines lines, and a flood of records beyond max_pending drops the oldest.
+    """
+
+    def __init__(self, text_edit, max_lines=5000, max_pending=10000, interval_ms=200):
         super().__init__()
         self.text_edit = text_edit
+        self.text_edit.setMaximumBlockCount(max_lines)  # QPlainTextEdit discards the oldest lines itself
+        self.pending = deque(maxlen=max_pending)
+        self.dropped = 0
+        self.drain_timer = QTimer(text_edit)
+        self.drain_timer.timeout.connect(self.drain)
+        self.drain_timer.start(interval_ms)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_edit.appendPlainText(msg)
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        # emit() runs under the handler lock, so this check-then-append is not racy
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append(msg)
+
+    def drain(self):
+        if not self.pending:
+            return
+        self.acquire()
+        try:
+            lines = list(self.pending)
+            self.pending.clear()
+            dropped, self.dropped = self.dropped, 0
+        finally:
+            self.release()
+        if dropped:
+            lines.insert(0, f"... {dropped} log lines dropped ...")
+        self.text_edit.appendPlainText('\n'.join(lines))
+
+    def close(self):
+        self.drain_timer.stop()
+        super().close()
+
+def clipboard_fingerprint(text):
+    # Length plus the interpreter's C-level string hash: one cheap pass instead of keeping and comparing full copies
+    return len(text), hash(text)
+
+class ParseReverseClipboardWatcher(QObject):
+    """ Single QClipboard.dataChanged listener that fans new clipboard text out to subscribed tabs """
+
+    def __init__(self, clipboard, parent=None):
+        super().__init__(parent)
+        self.clipboard = clipboard
+        self.subscribers = []
+        self.last_fingerprint = None
+        self.clipboard.dataChanged.connect(self.on_data_changed)
+
+    def subscribe(self, callback):
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def on_data_changed(self):
+        try:
+            if not self.subscribers:
+                return
+            text = self.clipboard.text()
+            fingerprint = clipboard_fingerprint(text)
+            if fingerprint == self.last_fingerprint:
+                return
+            self.last_fingerprint = fingerprint
+            for callback in list(self.subscribers):
+                callback(text, fingerprint)
+        except Exception as e:
+            logging.error(f"Clipboard Watcher Error: {str(e)}")
+
+class ParseReverseEditor(QPlainTextEdit):
+    """
+    Plain-text content pane with debounced change notification.
+    Text above LARGE_DOCUMENT_THRESHOLD is kept as one string and shown read-only, loading CHUNK_SIZE
+    pieces into the widget as the user scrolls, so huge pastes never go through a full text layout.
+    A paste spilled to disk (see parse_spill) is shown with set_preview; content() is then empty.
+    """
+    content_changed = pyqtSignal()
+    status_changed = pyqtSignal(str)
+
+    LARGE_DOCUMENT_THRESHOLD = 2 * 1024 * 1024
+    CHUNK_SIZE = 256 * 1024
+    DEBOUNCE_MS = 300
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.full_text = None
+        self.preview_status = None
+        self.loaded = 0
+        self.loading_chunk = False
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(self.DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.content_changed.emit)
+        self.textChanged.connect(self.on_text_changed)
+        self.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+
+    def is_large(self):
+        return self.full_text is not None
+
+    def content(self):
+        """ The whole document, including the parts of a large paste that are not loaded into the widget """
+        if self.preview_status is not None:
+            return ""
+        return self.full_text if self.full_text is not None else self.toPlainText()
+
+    def set_preview(self, text, status):
+        """ Show the start of a spilled paste read-only, with status in place of the large document note """
+        self.leave_large_mode()
+        self.preview_status = status
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setPlainText(text)
+        self.update_status()
+
+    def leave_preview_mode(self):
+        if self.preview_status is not None:
+            self.preview_status = None
+            self.setReadOnly(False)
+            self.setUndoRedoEnabled(True)
+
+    def set_content(self, text):
+        self.leave_preview_mode()
+        if len(text) > self.LARGE_DOCUMENT_THRESHOLD:
+            self.full_text = text
+            self.loaded = 0
+            self.loading_chunk = True
+            try:
+                super().clear()
+                self.setReadOnly(True)
+                self.setUndoRedoEnabled(False)
+                self.setLineWrapMode(QPlainTextEdit.NoWrap)
+                self.load_next_chunk()
+            finally:
+                self.loading_chunk = False
+            # Nobody is typing, so there is nothing to wait for
+            self.debounce_timer.stop()
+            self.content_changed.emit()
+        else:
+            self.leave_large_mode()
+            self.setPlainText(text)
+        self.update_status()
+
+    def clear(self):
+        self.leave_preview_mode()
+        self.leave_large_mode()
+        super().clear()
+        self.update_status()
+
+    def leave_large_mode(self):
+        if self.full_text is not None:
+            self.full_text = None
+            self.loaded = 0
+            self.setReadOnly(False)
+            self.setUndoRedoEnabled(True)
+            self.setLineWrapMode(QPlainTextEdit.WidgetWidth)
+
+    def load_next_chunk(self):
+        if self.full_text is None or self.loaded >= len(self.full_text):
+            return
+        end = min(self.loaded + self.CHUNK_SIZE, len(self.full_text))
+        newline = self.full_text.find('\n', end, end + self.CHUNK_SIZE)
+        if end < len(self.full_text) and newline != -1:
+            end = newline + 1  # Prefer to stop on a line boundary
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(self.full_text[self.loaded:end])
+        self.loaded = end
+        self.update_status()
+
+    def on_text_changed(self):
+        if not self.loading_chunk:
+            self.debounce_timer.start()
+
+    def on_scrolled(self, value):
+        scroll_bar = self.verticalScrollBar()
+        if self.full_text is not None and value >= scroll_bar.maximum() - scroll_bar.pageStep():
+            self.loading_chunk = True
+            try:
+                self.load_next_chunk()
+            finally:
+                self.loading_chunk = False
+
+    def insertFromMimeData(self, source):
+        # Route a huge paste into an empty (or fully selected) editor through the large-document view
+        if source.hasText() and not self.isReadOnly():
+            text = source.text()
+            cursor = self.textCursor()
+            replaces_all = self.document().isEmpty() or (cursor.selectionStart() == 0 and cursor.selectionEnd() >= self.document().characterCount() - 1)
+            if len(text) > self.LARGE_DOCUMENT_THRESHOLD and replaces_all:
+                self.set_content(text)
+                return
+        super().insertFromMimeData(source)
+
+    def update_status(self):
+        if self.preview_status is not None:
+            self.status_changed.emit(self.preview_status)
+        elif self.full_text is None:
+            self.status_changed.emit("")
+        else:
+            self.status_changed.emit(f"Large document (read-only): showing {self.loaded / 1048576:.1f} of {len(self.full_text) / 1048576:.1f} MB, scroll to load more")
+
+# Above this many changed runs of rows the file list is reset (keeping check state) instead of patched row by row
+MAX_ROW_CHANGES = 64
+
+
+def diff_names(old_names, new_names):
+    """
+    The runs (i1, i2, j1, j2) where old_names[i1:i2] became new_names[j1:j2], found with set lookups in one pass
+    over both lists. Returns None when names present in both lists changed order.
+    """
+    old_set = set(old_names)
+    new_set = set(new_names)
+    changes = []
+    i = j = 0
+    while i < len(old_names) or j < len(new_names):
+        i1, j1 = i, j
+        while i < len(old_names) and old_names[i] not in new_set:
+            i += 1
+        while j < len(new_names) and new_names[j] not in old_set:
+            j += 1
+        if i > i1 or j > j1:
+            changes.append((i1, i, j1, j))
+        if i < len(old_names) and j < len(new_names):
+            if old_names[i] != new_names[j]:
+                return None
+            i += 1
+            j += 1
+    return changes
+
+
+class ParseReverseFileListModel(QAbstractTableModel):
+    """
+    Detected files with their check state, updated by diffing against the previous parse instead of rebuilding.
+    Check state is kept by filename, so reparsing never resets the user's selection; size and line count are
+    only computed for rows the view actually asks for.
+    """
+    NAME, SIZE, LINES = range(3)
+    HEADERS = ["File", "Size", "Lines"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []
+        self.files = {}
+        self.unchecked = set()
+        self.stats = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == self.NAME:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self.names[index.row()]
+        column = index.column()
+        if role == Qt.CheckStateRole and column == self.NAME:
+            return Qt.Unchecked if name in self.unchecked else Qt.Checked
+        if role == Qt.DisplayRole:
+            if column == self.NAME:
+                return name
+            size, lines = self.file_stats(name)
+            return f"{size:,}" if column == self.SIZE else f"{lines:,}"
+        if role == Qt.TextAlignmentRole and column != self.NAME:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole or index.column() != self.NAME:
+            return False
+        name = self.names[index.row()]
+        if value == Qt.Checked:
+            self.unchecked.discard(name)
+        else:
+            self.unchecked.add(name)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def file_stats(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            content = stripped_text(self.files, name) if name in self.files else ""
+            stats = (len(content.encode('utf-8')), content.count('\n') + 1 if content else 0)
+            self.stats[name] = stats
+        return stats
+
+    def set_files(self, files):
+        new_names = [name for name in files if name]  # Ensure filename is not empty
+        old_names = self.names
+        self.files = files
+        self.stats.clear()
+
+        if new_names != old_names:
+            old_set = set(old_names)
+            changes = diff_names(old_names, new_names) if old_set.intersection(new_names) else None
+            if changes is None or len(changes) > MAX_ROW_CHANGES:
+                # Nothing in common (e.g. a fresh paste), reordered or changed all over: a reset is cheaper than
+                # patching, and the check state survives it because it is kept by name
+                self.beginResetModel()
+                self.names = new_names
+                self.endResetModel()
+                return
+            # Apply from the end so the row numbers of earlier changes stay valid
+            for i1, i2, j1, j2 in reversed(changes):
+                if i2 - i1 == j2 - j1:
+                    # Renamed in place (e.g. while typing a marker): the row keeps its check state
+                    for old_name, new_name in zip(old_names[i1:i2], new_names[j1:j2]):
+                        if old_name in self.unchecked and new_name not in old_set:
+                            self.unchecked.add(new_name)
+                    self.names[i1:i2] = new_names[j1:j2]
+                    self.dataChanged.emit(self.index(i1, self.NAME), self.index(i2 - 1, self.LINES))
+                    continue
+                if i2 > i1:
+                    self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                    del self.names[i1:i2]
+                    self.endRemoveRows()
+                if j2 > j1:
+                    self.beginInsertRows(QModelIndex(), i1, i1 + j2 - j1 - 1)
+                    self.names[i1:i1] = new_names[j1:j2]
+                    self.endInsertRows()
+
+        if self.names:
+            # Contents may have changed under unchanged names
+            self.dataChanged.emit(self.index(0, self.SIZE), self.index(len(self.names) - 1, self.LINES))
+
+    def set_all_checked(self, checked):
+        if checked:
+            self.unchecked.clear()
+        else:
+            self.unchecked.update(self.names)
+        if self.names:
+            self.dataChanged.emit(self.index(0, self.NAME), self.index(len(self.names) - 1, self.NAME), [Qt.CheckStateRole])
+
+    def checked_files(self):
+        return [name for name in self.names if name not in self.unchecked]
+
+class ParseReverseHistoryModel(QAbstractTableModel):
+    """
+    parse_history rows for one search, newest first. Only the first page is queried up front; Qt asks for the
+    next one through canFetchMore/fetchMore as the view is scrolled to the bottom.
+    """
+    TIME, FOLDER, FILE, SIZE = range(4)
+    HEADERS = ["Time", "Folder", "File", "Size"]
+    fetch_failed = pyqtSignal(str)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.rows = []
+        self.search = {}
+        self.exhausted = True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == self.TIME:
+                return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row['created_at']))
+            if column == self.FOLDER:
+                return row['folder']
+            if column == self.FILE:
+                return row['filename']
+            return f"{row['size']:,}"
+        if role == Qt.TextAlignmentRole and column == self.SIZE:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def set_search(self, query=None, folder=None, filename=None):
+        self.beginResetModel()
+        self.rows = []
+        self.search = {'query': query, 'folder': folder, 'filename': filename}
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        last = self.rows[-1] if self.rows else None
+        try:
+            with self.db.connection() as conn:
+                page = search_history(conn, after=(last['run_id'], last['filename']) if last else None,
+                                      limit=HISTORY_PAGE_SIZE, **self.search)
+        except Exception as e:
+            # Called by the view, so report instead of raising into Qt
+            self.exhausted = True
+            self.fetch_failed.emit(str(e))
+            return
+        self.exhausted = len(page) < HISTORY_PAGE_SIZE
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+class ParseReverseWorker(QThread):
+    progress = pyqtSignal(int, int)
+    parse_finished = pyqtSignal(dict)
+    parse_failed = pyqtSignal(str)
+
+    def __init__(self, content, path, delimiter, delimiter_type, selected_files, db, files=None, metrics=None, spill=None, parent=None):
+        super().__init__(parent)
+        self.content = content
+        self.files = files
+        self.spill = spill
+        self.metrics = metrics
+        self.path = path
+        self.delimiter = delimiter
+        self.delimiter_type = delimiter_type
+        self.selected_files = selected_files
+        self.db = db
+
+    def run(self):
+        # Runs off the GUI thread: never touch widgets or the log widget from here, only emit signals
+        try:
+            files = self.spill.files(self.delimiter, self.delimiter_type) if self.spill is not None else self.files
+            result = reverse_parse_to_disk(self.content, self.path, self.delimiter, self.delimiter_type, self.selected_files,
+                                           self.db, files, self.progress.emit, self.isInterruptionRequested,
+                                           metrics=self.metrics)
+            self.parse_finished.emit(result)
+        except Exception as e:
+            self.parse_failed.emit(str(e))
+
+class ParseReverseDiffWorker(QThread):
+    progress = pyqtSignal(int, int)
+    diff_finished = pyqtSignal(dict)
+    diff_failed = pyqtSignal(str)
+
+    def __init__(self, content, path, delimiter, delimiter_type, selected_files, files=None, spill=None, parent=None):
+        super().__init__(parent)
+        self.content = content
+        self.files = files
+        self.spill = spill
+        self.path = path
+        self.delimiter = delimiter
+        self.delimiter_type = delimiter_type
+        self.selected_files = selected_files
+
+    def run(self):
+        try:
+            files = self.spill.files(self.delimiter, self.delimiter_type) if self.spill is not None else self.files
+            result = diff_to_disk(self.content, self.path, self.delimiter, self.delimiter_type, self.selected_files,
+                                  files, self.progress.emit, self.isInterruptionRequested)
+            self.diff_finished.emit(result)
+        except Exception as e:
+            self.diff_failed.emit(str(e))
+
+class ParseReverseScanWorker(QThread):
+    """
+    Scans a spilled paste for one delimiter; the result is cached on the spill for update_file_list to pick up.
+    Given the text of a paste instead of a spill, it writes the spill first and emits spilled.
+    """
+    spilled = pyqtSignal(object)
+    scan_failed = pyqtSignal(str)
+
+    def __init__(self, spill, delimiter, delimiter_type, text=None, parent=None):
+        super().__init__(parent)
+        self.spill = spill
+        self.delimiter = delimiter
+        self.delimiter_type = delimiter_type
+        self.text = text
+
+    def run(self):
+        try:
+            if self.spill is None:
+                text, self.text = self.text, None
+                with profiled("spill"):
+                    self.spill = ParseReverseSpill.from_text(text, is_cancelled=self.isInterruptionRequested)
+                if self.spill is None:
+                    return
+                self.spilled.emit(self.spill)
+            if self.delimiter:
+                self.spill.files(self.delimiter, self.delimiter_type)
+        except Exception as e:
+            self.scan_failed.emit(str(e))
+
+class ParseReverseFileDiffWorker(QThread):
+    diff_ready = pyqtSignal(str, str)
+
+    def __init__(self, path, filename, text, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.filename = filename
+        self.text = text
+
+    def run(self):
+        try:
+            lines = file_diff(self.path, self.filename, self.text)
+            self.diff_ready.emit(self.filename, "\n".join(lines) if lines else "No changes")
+        except Exception as e:
+            self.diff_ready.emit(self.filename, f"Could not diff {self.filename}: {str(e)}")
+
+class ParseReverseAutoParseWorker(QThread):
+    job_finished = pyqtSignal(dict)
+    job_failed = pyqtSignal(str, str)
+    queue_changed = pyqtSignal(dict)
+
+    def __init__(self, job_queue, db, parent=None):
+        super().__init__(parent)
+        self.job_queue = job_queue
+        self.db = db
+
+    def run(self):
+        # Drains the coalescing queue one job at a time, so a folder is never written by two parses at once
+        while not self.isInterruptionRequested():
+            entry = self.job_queue.get()
+            if entry is None:
+                break
+            _, job = entry
+            self.queue_changed.emit(self.job_queue.stats())
+            spill = None
+            try:
+                files = None
+                if exceeds_budget(job['content']):
+                    # Parse from a temp file instead, so the text can be let go of while the files are written
+                    spill = ParseReverseSpill.from_text(job.pop('content'))
+                    job['content'] = ""
+                    files = spill.files(job['delimiter'], job['delimiter_type'])
+                result = reverse_parse_to_disk(job['content'], job['path'], job['delimiter'], job['delimiter_type'],
+                                               db=self.db, files=files, is_cancelled=self.isInterruptionRequested)
+                self.job_finished.emit(result)
+            except Exception as e:
+                self.job_failed.emit(job['path'], str(e))
+            finally:
+                if spill is not None:
+                    spill.close()
+                self.job_queue.task_done()
+                self.queue_changed.emit(self.job_queue.stats())
+
+class ParseReverseWatchWorker(QThread):
+    bundle_finished = pyqtSignal(dict)
+    bundle_failed = pyqtSignal(str, str)
+
+    def __init__(self, watcher, parent=None):
+        super().__init__(parent)
+        self.watcher = watcher
+
+    def run(self):
+        try:
+            self.watcher.run(self.bundle_finished.emit, self.bundle_failed.emit, self.isInterruptionRequested)
+        except Exception as e:
+            self.bundle_failed.emit(self.watcher.inbox, str(e))
+
+class ParseReverseRestoreWorker(QThread):
+    progress = pyqtSignal(int, int)
+    restore_finished = pyqtSignal(dict)
+    restore_failed = pyqtSignal(str)
+
+    def __init__(self, db, entries, path, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.entries = entries
+        self.path = path
+
+    def run(self):
+        try:
+            self.restore_finished.emit(restore_files(self.db, self.entries, self.path, self.progress.emit, self.isInterruptionRequested))
+        except Exception as e:
+            self.restore_failed.emit(str(e))
+
+class ParseReverseBackfillWorker(QThread):
+    """ Runs the database backfills (legacy rows, history index) in committed batches after startup """
+    backfill_finished = pyqtSignal(bool)
+    backfill_failed = pyqtSignal(str)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+
+    def run(self):
+        try:
+            self.backfill_finished.emit(self.db.backfill(self.isInterruptionRequested))
+        except Exception as e:
+            self.backfill_failed.emit(str(e))
+
+class ParseReverseBundleWorker(QThread):
+    progress = pyqtSignal(int, int)
+    bundle_finished = pyqtSignal(dict)
+    bundle_failed = pyqtSignal(str)
+
+    def __init__(self, bundler, output_path=None, index=None, parent=None):
+        super().__init__(parent)
+        self.bundler = bundler
+        self.output_path = output_path
+        self.index = index
+
+    def run(self):
+        try:
+            if self.output_path:
+                # Stream into a side file so a cancelled or failed bundle never replaces a good one
+                part_path = self.output_path + ".part"
+                with open(part_path, 'w', encoding='utf-8') as f:
+                    summary = self.bundler.write_to(f.write, self.progress.emit, self.isInterruptionRequested, self.index)
+                if summary['cancelled']:
+                    os.remove(part_path)
+                else:
+                    os.replace(part_path, self.output_path)
+            else:
+                # The clipboard needs a single string, so join the streamed chunks exactly once
+                chunks = []
+                summary = self.bundler.write_to(chunks.append, self.progress.emit, self.isInterruptionRequested, self.index)
+                summary['text'] = ''.join(chunks)
+            summary['output_path'] = self.output_path
+            self.bundle_finished.emit(summary)
+        except Exception as e:
+            self.bundle_failed.emit(str(e))
 
 class ParseReverseApp(QWidget):
+    ready = pyqtSignal(dict)
+
     def __init__(self):
         super().__init__()
+        self.startup_metrics = ParseReverseMetrics("startup")
+        # From process creation, so interpreter start and every import are included
+        age = process_age()
+        self.startup_metrics.add_time("launch", age if age is not None else time.perf_counter() - STARTED_AT)
+        self.startup_finished = False
         self.setWindowIcon(QtGui.QIcon(resource_path("app_icon.ico")))
         self.clipboard = QApplication.clipboard()
+        self.clipboard_watcher = ParseReverseClipboardWatcher(self.clipboard, self)
         self.tabs = []
         self.show_notifications = True
         self.db_path = "C:/TSTP/ParseReverse/DB/folders.db"
-        self.create_db()
+        self.db = ParseReverseDatabase(self.db_path)
+        self.last_parse = None  # (content, delimiter, delimiter_type, files) of the most recent parse
+        self.auto_parse_queue = ParseReverseCoalescingQueue()
+        self.auto_parse_worker = None
+        self.log_file_listener = None
+        self.tray_icon = None
+        self.history_dialog = None
+        self.backfill_worker = None
         try:
-            self.initUI()
-            self.init_tray_icon()
-            self.init_logging()
+            with self.startup_metrics.stage("window"):
+                self.initUI()
+                self.init_logging()
+            # The database, saved folders and tray icon are set up once the window is on screen
+            QTimer.singleShot(0, self.finish_startup)
         except Exception as e:
             logging.error(f"Initialization Error: {str(e)}")
             self.show_error("Initialization Error", f"An error occurred during initialization: {str(e)}")
             sys.exit(1)
 
+    def finish_startup(self):
+        try:
+            with self.startup_metrics.stage("deferred"):
+                self.create_db()
+                for tab_data in self.tabs:
+                    self.load_saved_folders(tab_data['path_input'])
+                if self.tray_icon is None:
+                    self.init_tray_icon()
+            self.startup_finished = True
+            metrics = self.startup_metrics.as_dict()
+            record_run(metrics)
+            logging.info(format_metrics(metrics))
+            self.ready.emit(metrics)
+        except Exception as e:
+            logging.error(f"Startup Error: {str(e)}")
+            self.show_error("Startup Error", f"An error occurred while finishing startup: {str(e)}")
+
     def init_logging(self):
-        self.log_area_handler = ParseReverseQTextEditLogger(self.log_area)
-        self.log_area_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        self.log_area_handler = ParseReverseQTextEditLogger(self.log_area, max_lines=configured_max_lines())
+        self.log_area_handler.setFormatter(logging.Formatter(LOG_FORMAT))
         logging.getLogger().addHandler(self.log_area_handler)
-        logging.getLogger().setLevel(logging.DEBUG)
+        self.set_log_level(configured_level())
+        self.log_file_listener = start_file_sink()
         logging.info("Logging initialized and ready.")
 
+    def set_log_level(self, level):
+        logging.getLogger().setLevel(level)
+        for action in getattr(self, 'log_level_actions', {}).values():
+            action.setChecked(action.text() == level)
+        logging.info(f"Log level set to {level}")
+
     def create_db(self):
         try:
-            os.makedirs("C:/TSTP/ParseReverse/DB", exist_ok=True)
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''CREATE TABLE IF NOT EXISTS folders (id INTEGER PRIMARY KEY, path TEXT UNIQUE)''')
-            cursor.execute('''CREATE TABLE IF NOT EXISTS parsed_items (id INTEGER PRIMARY KEY, content TEXT)''')
-            conn.commit()
-            conn.close()
+            self.db.migrate()
+            # Moving old rows and indexing them for history search can take minutes on a large database
+            self.backfill_worker = ParseReverseBackfillWorker(self.db, self)
+            self.backfill_worker.backfill_finished.connect(self.on_backfill_finished)
+            self.backfill_worker.backfill_failed.connect(lambda message: logging.error(f"Database Backfill Error: {message}"))
+            self.backfill_worker.finished.connect(self.on_backfill_worker_done)
+            self.backfill_worker.start()
         except Exception as e:
             logging.error(f"Database Creation Error: {str(e)}")
             self.show_error("Database Creation Error", f"An error occurred while creating the database: {str(e)}")
 
+    def on_backfill_worker_done(self):
+        self.backfill_worker.deleteLater()
+        self.backfill_worker = None
+
+    def on_backfill_finished(self, complete):
+        if complete:
+            logging.info("Database backfill finished")
+            if self.history_dialog is not None:
+                self.history_dialog.update_search_available()
+
     def initUI(self):
         try:
             self.layout = QVBoxLayout()
@@ -84,6 +792,19 @@ class ParseReverseApp(QWidget):
             save_action.setShortcut('Ctrl+S')
             file_menu.addAction(save_action)
 
+            open_indexed_action = QAction('Open Indexed Bundle...', self)
+            open_indexed_action.triggered.connect(self.open_indexed_bundle)
+            file_menu.addAction(open_indexed_action)
+
+            history_action = QAction('History...', self)
+            history_action.triggered.connect(self.show_history)
+            history_action.setShortcut('Ctrl+H')
+            file_menu.addAction(history_action)
+
+            export_metrics_action = QAction('Export Metrics...', self)
+            export_metrics_action.triggered.connect(self.export_metrics)
+            file_menu.addAction(export_metrics_action)
+
             exit_action = QAction('Exit', self)
             exit_action.triggered.connect(self.close)
             file_menu.addAction(exit_action)
@@ -119,6 +840,15 @@ class ParseReverseApp(QWidget):
             toggle_log_action.setCheckable(True)
             edit_menu.addAction(toggle_log_action)
 
+            log_level_menu = edit_menu.addMenu('Log Level')
+            self.log_level_actions = {}
+            for level in LOG_LEVELS:
+                level_action = QAction(level, self)
+                level_action.setCheckable(True)
+                level_action.triggered.connect(lambda checked, level=level: self.set_log_level(level))
+                log_level_menu.addAction(level_action)
+                self.log_level_actions[level] = level_action
+
             help_menu.addAction(self.create_action("TSTP.xyz", lambda: QDesktopServices.openUrl(QUrl("https://www.tstp.xyz"))))
 
             tutorial_action = QAction('Tutorial', self)
@@ -161,17 +891,22 @@ class ParseReverseApp(QWidget):
             tab_layout = QVBoxLayout()
 
             # Content text area
-            content_area = QTextEdit()
-            content_area.textChanged.connect(self.update_file_list)
+            content_area = ParseReverseEditor()
+            content_area.content_changed.connect(lambda: self.update_file_list(tab))
             tab_layout.addWidget(content_area)
 
+            content_status = QLabel()
+            content_status.setVisible(False)
+            content_area.status_changed.connect(lambda text: self.update_content_status(content_status, text))
+            tab_layout.addWidget(content_status)
+
             # File delimiter input
             delimiter_layout = QHBoxLayout()
             delimiter_layout.addWidget(QLabel("File Delimiter:"))
             delimiter_input = QComboBox()
             delimiter_input.setEditable(True)
             delimiter_input.addItems(["//", "###", "/*", "<!--"])
-            delimiter_input.currentTextChanged.connect(self.update_delimiter_example)
+            delimiter_input.currentTextChanged.connect(lambda text: self.on_delimiter_changed(tab, delimiter_input, delimiter_type, delimiter_example))
             delimiter_layout.addWidget(delimiter_input)
 
             save_delimiter_button = QPushButton("Save Delimiter")
@@ -180,7 +915,7 @@ class ParseReverseApp(QWidget):
 
             delimiter_type = QComboBox()
             delimiter_type.addItems(["Prefix", "Surround"])
-            delimiter_type.currentTextChanged.connect(self.update_delimiter_example)
+            delimiter_type.currentTextChanged.connect(lambda text: self.on_delimiter_changed(tab, delimiter_input, delimiter_type, delimiter_example))
             delimiter_layout.addWidget(delimiter_type)
 
             delimiter_example = QLineEdit()
@@ -194,7 +929,8 @@ class ParseReverseApp(QWidget):
             path_layout = QHBoxLayout()
             path_input = QComboBox()
             path_input.setEditable(True)
-            self.load_saved_folders(path_input)
+            if self.startup_finished:  # The first tab gets its folders from finish_startup
+                self.load_saved_folders(path_input)
             path_layout.addWidget(path_input)
 
             path_button = QPushButton("Select Folder")
@@ -207,15 +943,73 @@ class ParseReverseApp(QWidget):
 
             tab_layout.addLayout(path_layout)
 
+            # Inbox watched while Auto Parse is on
+            inbox_layout = QHBoxLayout()
+            inbox_input = QLineEdit()
+            inbox_input.setPlaceholderText("Inbox folder: bundle files dropped here are parsed while Auto Parse is on")
+            inbox_layout.addWidget(inbox_input)
+
+            inbox_button = QPushButton("Select Inbox")
+            inbox_button.clicked.connect(lambda: self.select_inbox(inbox_input))
+            inbox_layout.addWidget(inbox_button)
+            tab_layout.addLayout(inbox_layout)
+
+            # Folder to bundle filters
+            bundle_layout = QHBoxLayout()
+            bundle_layout.addWidget(QLabel("Include:"))
+            include_input = QLineEdit()
+            include_input.setPlaceholderText("e.g. *.py, *.html (empty = all)")
+            bundle_layout.addWidget(include_input)
+
+            bundle_layout.addWidget(QLabel("Exclude:"))
+            exclude_input = QLineEdit(", ".join(DEFAULT_EXCLUDES))
+            bundle_layout.addWidget(exclude_input)
+
+            bundle_file_button = QPushButton("Bundle to File")
+            bundle_file_button.clicked.connect(lambda: self.bundle_folder(tab, to_clipboard=False))
+            bundle_layout.addWidget(bundle_file_button)
+
+            bundle_clipboard_button = QPushButton("Bundle to Clipboard")
+            bundle_clipboard_button.clicked.connect(lambda: self.bundle_folder(tab, to_clipboard=True))
+            bundle_layout.addWidget(bundle_clipboard_button)
+            tab_layout.addLayout(bundle_layout)
+
             # List of files and checkboxes
-            file_list = QListWidget()
-            tab_layout.addWidget(file_list)
+            file_list = ParseReverseFileListModel(self)
+            file_view = QTreeView()
+            file_view.setModel(file_list)
+            file_view.setRootIsDecorated(False)
+            file_view.setUniformRowHeights(True)  # Lets the view skip measuring rows it never shows
+            file_view.header().setStretchLastSection(False)
+            file_view.header().setSectionResizeMode(ParseReverseFileListModel.NAME, QHeaderView.Stretch)
+            tab_layout.addWidget(file_view)
+
+            # Progress of the background parse
+            progress_layout = QHBoxLayout()
+            progress_bar = QProgressBar()
+            progress_bar.setVisible(False)
+            progress_layout.addWidget(progress_bar)
+
+            cancel_button = QPushButton("Cancel")
+            cancel_button.setVisible(False)
+            cancel_button.clicked.connect(lambda: self.cancel_parse(tab))
+            progress_layout.addWidget(cancel_button)
+
+            queue_label = QLabel()
+            queue_label.setVisible(False)
+            progress_layout.addWidget(queue_label)
+            tab_layout.addLayout(progress_layout)
+
+            # Timings of the last parse or bundle in this tab
+            metrics_label = QLabel()
+            metrics_label.setVisible(False)
+            tab_layout.addWidget(metrics_label)
 
             # Buttons
             button_layout = QHBoxLayout()
 
             clear_button = QPushButton("Clear")
-            clear_button.clicked.connect(lambda: content_area.clear())
+            clear_button.clicked.connect(lambda: self.clear_content(tab))
             button_layout.addWidget(clear_button)
 
             auto_clipboard_button = QCheckBox("Auto Clipboard")
@@ -238,6 +1032,10 @@ class ParseReverseApp(QWidget):
             save_button.clicked.connect(lambda: self.save_content(content_area))
             button_layout.addWidget(save_button)
 
+            diff_button = QPushButton("Diff")
+            diff_button.clicked.connect(lambda: self.diff_parse(tab))
+            button_layout.addWidget(diff_button)
+
             reverse_parse_button = QPushButton("Parse")
             reverse_parse_button.clicked.connect(lambda: self.reverse_parse(content_area, path_input, delimiter_input, delimiter_type, file_list))
             button_layout.addWidget(reverse_parse_button)
@@ -253,16 +1051,27 @@ class ParseReverseApp(QWidget):
                 'delimiter_type': delimiter_type,
                 'delimiter_example': delimiter_example,
                 'path_input': path_input,
+                'inbox_input': inbox_input,
+                'include_input': include_input,
+                'exclude_input': exclude_input,
                 'file_list': file_list,
+                'progress_bar': progress_bar,
+                'cancel_button': cancel_button,
+                'queue_label': queue_label,
+                'metrics_label': metrics_label,
+                'parse_worker': None,
+                'scan_workers': [],  # Running ParseReverseScanWorkers, newest last
+                'pending_spill': None,  # The worker writing a large paste to disk, until it is the source
+                'watch_worker': None,
+                'source': None,  # An opened indexed bundle or a spilled paste, when the editor does not hold the text
                 'auto_clipboard_button': auto_clipboard_button,
                 'auto_parse_button': auto_parse_button,
-                'auto_clipboard_timer': QTimer(self),
                 'check_folder_timer': QTimer(self),
-                'last_clipboard_content': ''  # Initialize last_clipboard_content
+                'last_clipboard_fingerprint': None
             })
-
-            # Connect the clipboard timer to the check_clipboard method
-            self.tabs[-1]['auto_clipboard_timer'].timeout.connect(self.check_clipboard)
+            tab_data = self.tabs[-1]
+            tab_data['clipboard_callback'] = lambda text, fingerprint: self.check_clipboard(tab_data, text, fingerprint)
+            tab_data['check_folder_timer'].timeout.connect(lambda: self.check_folder(tab_data))
 
             logging.info(f"New tab created: Tab {len(self.tabs)}")
 
@@ -271,8 +1080,17 @@ class ParseReverseApp(QWidget):
             self.show_error("New Tab Error", f"An error occurred while creating a new tab: {str(e)}")
             raise
 
+    def update_content_status(self, content_status, text):
+        content_status.setText(text)
+        content_status.setVisible(bool(text))
+
     def close_tab(self, index):
         try:
+            self.clipboard_watcher.unsubscribe(self.tabs[index]['clipboard_callback'])
+            self.cancel_spill(self.tabs[index])
+            self.stop_parse_worker(self.tabs[index])
+            self.stop_watch(self.tabs[index])
+            self.set_source(self.tabs[index], None)
             self.tab_widget.removeTab(index)
             self.tabs.pop(index)
             logging.info(f"Tab {index + 1} closed")
@@ -282,26 +1100,26 @@ class ParseReverseApp(QWidget):
 
     def on_tab_changed(self, index):
         try:
-            if index != -1:
-                for tab_index, tab_data in enumerate(self.tabs):
-                    if tab_data['auto_clipboard_button'].isChecked():
-                        if tab_index == index:
-                            tab_data['auto_clipboard_timer'].start(1000)
-                        else:
-                            tab_data['auto_clipboard_timer'].stop()
-            logging.info(f"Switched to tab {index + 1}")
+            logging.debug(f"Switched to tab {index + 1}")
         except Exception as e:
             logging.error(f"Tab Changed Error: {str(e)}")
             self.show_error("Tab Changed Error", f"An error occurred while changing tabs: {str(e)}")
 
+    def on_delimiter_changed(self, tab, delimiter_input, delimiter_type, delimiter_example):
+        self.update_delimiter_example(delimiter_input, delimiter_type, delimiter_example)
+        self.update_file_list(tab)
+
     def update_delimiter_example(self, delimiter_input, delimiter_type, delimiter_example):
         try:
-            delimiter = delimiter_input.currentText()
-            if delimiter_type.currentText() == "Prefix":
-                delimiter_example.setText(f"{delimiter} filename.filetype")
-            else:
-                delimiter_example.setText(f"{delimiter} filename.filetype {delimiter}")
-            logging.info(f"Delimiter example updated: {delimiter_example.text()}")
+            examples = []
+            # Several delimiters can be combined as "### | <!--:Surround"
+            for delimiter, marker_type in parse_marker_spec(delimiter_input.currentText(), delimiter_type.currentText()):
+                if marker_type == "Prefix":
+                    examples.append(f"{delimiter} filename.filetype")
+                else:
+                    examples.append(f"{delimiter} filename.filetype {delimiter}")
+            delimiter_example.setText("   ".join(examples))
+            logging.debug(f"Delimiter example updated: {delimiter_example.text()}")
         except Exception as e:
             logging.error(f"Update Delimiter Example Error: {str(e)}")
             self.show_error("Update Delimiter Example Error", f"An error occurred while updating the delimiter example: {str(e)}")
@@ -330,11 +1148,8 @@ class ParseReverseApp(QWidget):
         try:
             folder = path_input.currentText()
             if folder:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute('''INSERT OR IGNORE INTO folders (path) VALUES (?)''', (folder,))
-                conn.commit()
-                conn.close()
+                with self.db.transaction() as conn:
+                    conn.execute('''INSERT OR IGNORE INTO folders (path) VALUES (?)''', (folder,))
                 # Update the combobox with the saved folder
                 self.load_saved_folders(path_input)
             logging.info(f"Folder saved: {folder}")
@@ -344,47 +1159,59 @@ class ParseReverseApp(QWidget):
 
     def load_saved_folders(self, path_input):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''SELECT path FROM folders''')
-            folders = cursor.fetchall()
+            with self.db.connection() as conn:
+                folders = conn.execute('''SELECT path FROM folders''').fetchall()
             path_input.clear()  # Clear current items before loading
             for folder in folders:
                 path_input.addItem(folder[0])
-            conn.close()
-            logging.info(f"Saved folders loaded: {folders}")
+            logging.info(f"Saved folders loaded: {len(folders)}")
+            logging.debug(f"Saved folders: {[folder[0] for folder in folders]}")
         except Exception as e:
             logging.error(f"Load Saved Folders Error: {str(e)}")
             self.show_error("Load Saved Folders Error", f"An error occurred while loading saved folders: {str(e)}")
 
     def detect_delimiter(self):
         try:
-            content = self.tabs[self.tab_widget.currentIndex()]['content_area'].toPlainText()
+            tab_data = self.tabs[self.tab_widget.currentIndex()]
+            content = tab_data['content_area'].content()
+            if not content and isinstance(tab_data['source'], ParseReverseSpill):
+                content = tab_data['source'].preview()  # Detection only samples the start of the text anyway
             if not content:
                 self.show_error("Detect Delimiter Error", "Content area is empty")
                 return
 
-            delimiters = set(re.findall(r'\W+', content))
-            if not delimiters:
+            candidates = detect_delimiters(content)
+            if not candidates:
                 self.show_error("Detect Delimiter Error", "No delimiters detected in the content")
                 return
 
             dialog = QDialog(self)
+            dialog.setAttribute(Qt.WA_DeleteOnClose)
             dialog.setWindowTitle("TSTP:PR - Select Delimiter")
             layout = QVBoxLayout()
             dialog.setLayout(layout)
 
             delimiter_combobox = QComboBox()
-            delimiter_combobox.addItems(delimiters)
+            # Mixed bundles (e.g. "###" for Python next to "<!--" for HTML) can be parsed with all strong candidates at once
+            strong = [candidate for candidate in candidates if candidate['confidence'] >= 0.2]
+            if len(strong) > 1:
+                markers = [(candidate['delimiter'], candidate['type']) for candidate in strong]
+                delimiter_combobox.addItem(f"All of: {format_marker_spec(markers, 'Prefix')}",
+                                           {'delimiter': format_marker_spec(markers, 'Prefix'), 'type': 'Prefix'})
+            for candidate in candidates:
+                delimiter_combobox.addItem(f"{candidate['delimiter']}  ({candidate['type']}, {candidate['confidence']:.0%}, "
+                                           f"{candidate['files']} files)", candidate)
             layout.addWidget(delimiter_combobox)
 
             select_button = QPushButton("Select")
             layout.addWidget(select_button)
 
             def on_select():
-                selected_delimiter = delimiter_combobox.currentText()
-                if selected_delimiter:
-                    self.tabs[self.tab_widget.currentIndex()]['delimiter_input'].setCurrentText(selected_delimiter)
+                candidate = delimiter_combobox.currentData()
+                if candidate:
+                    tab_data = self.tabs[self.tab_widget.currentIndex()]
+                    tab_data['delimiter_input'].setCurrentText(candidate['delimiter'])
+                    tab_data['delimiter_type'].setCurrentText(candidate['type'])
                 dialog.close()
 
             select_button.clicked.connect(on_select)
@@ -398,58 +1225,127 @@ class ParseReverseApp(QWidget):
     def toggle_select_all(self, select_all_button, file_list):
         try:
             select_all = select_all_button.text() == "Select All"
-            for index in range(file_list.count()):
-                item = file_list.item(index)
-                item.setCheckState(Qt.Checked if select_all else Qt.Unchecked)
+            file_list.set_all_checked(select_all)
             select_all_button.setText("Deselect All" if select_all else "Select All")
             logging.info("Select All toggled")
         except Exception as e:
             logging.error(f"Toggle Select All Error: {str(e)}")
             self.show_error("Toggle Select All Error", f"An error occurred while toggling select all: {str(e)}")
 
-    def update_file_list(self):
+    def update_file_list(self, tab=None):
         try:
-            content = self.tabs[self.tab_widget.currentIndex()]['content_area'].toPlainText()
-            delimiter = self.tabs[self.tab_widget.currentIndex()]['delimiter_input'].currentText()
-            delimiter_type = self.tabs[self.tab_widget.currentIndex()]['delimiter_type'].currentText()
+            if tab is None:
+                tab = self.tab_widget.widget(self.tab_widget.currentIndex())
+            tab_data = next((t for t in self.tabs if t['tab'] == tab), None)
+            if tab_data is None:
+                return  # The tab is still being built
+
+            content = tab_data['content_area'].content()
+            delimiter = tab_data['delimiter_input'].currentText()
+            delimiter_type = tab_data['delimiter_type'].currentText()
 
             if not delimiter:
                 return
 
-            files = {}
-            current_file = None
-
-            if delimiter_type == "Prefix":
-                pattern = f"^{re.escape(delimiter)}\\s*(.+\\..+)$"  # Ensure the filename has an extension
-            else:  # Surround
-                pattern = f"^{re.escape(delimiter)}\\s*(.+\\..+)\\s*{re.escape(delimiter)}$"
-
-            for line in content.split('\n'):
-                match = re.match(pattern, line.strip())
-                if match:
-                    current_file = match.group(1)
-                    if current_file:
-                        files[current_file] = ""
-                elif current_file:
-                    files[current_file] += line + '\n'
-
-            self.tabs[self.tab_widget.currentIndex()]['file_list'].clear()
-            for filename in files.keys():
-                if filename:  # Ensure filename is not empty
-                    item = QListWidgetItem(filename)
-                    item.setCheckState(Qt.Checked)
-                    self.tabs[self.tab_widget.currentIndex()]['file_list'].addItem(item)
-            logging.info("File list updated")
+            if content:
+                self.set_source(tab_data, None)  # New text replaces an opened indexed bundle or spilled paste
+            elif self.scan_spill(tab_data, delimiter, delimiter_type):
+                return
+            files = self.known_files(tab_data, content, delimiter, delimiter_type) or self.parse_files(content, delimiter, delimiter_type)
+
+            tab_data['file_list'].set_files(files)
+            logging.debug("File list updated")
         except Exception as e:
             logging.error(f"Update File List Error: {str(e)}")
             self.show_error("Update File List Error", f"An error occurred while updating the file list: {str(e)}")
 
+    def parse_files(self, content, delimiter, delimiter_type):
+        # update_file_list runs on every text change and reverse_parse usually follows on the same text, so reuse that result
+        if self.last_parse is not None:
+            last_content, last_delimiter, last_type, last_files = self.last_parse
+            if last_delimiter == delimiter and last_type == delimiter_type and last_content == content:
+                return last_files
+        with profiled("scan"):
+            files = ParseReverseEngine(delimiter, delimiter_type).spans(content)
+        self.last_parse = (content, delimiter, delimiter_type, files)
+        return files
+
+    def scan_spill(self, tab_data, delimiter, delimiter_type):
+        """
+        Start scanning the tab's spilled paste on a worker when this delimiter has not been scanned yet, and return
+        whether it did; update_file_list runs again with the cached result once the scan is done.
+        """
+        spill = tab_data['source']
+        if not isinstance(spill, ParseReverseSpill) or spill.scanned(delimiter, delimiter_type) is not None:
+            return False
+        tab_data['file_list'].set_files({})
+        running = tab_data['scan_workers'][-1] if tab_data['scan_workers'] else None
+        if (running is not None and running.isRunning()
+                and (running.spill, running.delimiter, running.delimiter_type) == (spill, delimiter, delimiter_type)):
+            return True
+        self.start_scan_worker(tab_data, ParseReverseScanWorker(spill, delimiter, delimiter_type, parent=self))
+        return True
+
+    def start_scan_worker(self, tab_data, worker):
+        worker.scan_failed.connect(lambda message: self.on_scan_failed(worker, message))
+        worker.finished.connect(lambda: self.on_scan_finished(tab_data, worker))
+        worker.finished.connect(worker.deleteLater)
+        tab_data['scan_workers'].append(worker)
+        worker.start()
+
+    def on_scan_failed(self, worker, message):
+        if not worker.isInterruptionRequested():
+            self.show_error("Update File List Error", f"An error occurred while scanning the paste: {message}")
+
+    def on_spilled(self, tab_data, worker, spill):
+        if tab_data not in self.tabs or tab_data['pending_spill'] is not worker:
+            # Cleared, replaced by another paste or the tab closed while it was being written
+            self.close_after(spill, [worker])
+            return
+        tab_data['pending_spill'] = None
+        self.set_source(tab_data, spill)
+        tab_data['content_area'].set_preview(spill.preview(), f"Large paste (read-only preview): {spill.stats()}")
+        logging.info(f"Paste of {spill.chars} characters is over the {configured_memory_budget() // 1048576} MB budget, spilled to {spill.path}")
+
+    def on_scan_finished(self, tab_data, worker):
+        latest = tab_data['scan_workers'][-1] is worker
+        tab_data['scan_workers'].remove(worker)
+        if tab_data['pending_spill'] is worker:
+            tab_data['pending_spill'] = None  # The write failed; the error has been shown
+        if not latest:
+            return  # A scan for a newer delimiter or paste is still running and will update the list
+        # The paste may have been replaced or the tab closed meanwhile; a failed scan has already been reported
+        if (tab_data in self.tabs and worker.spill is not None and tab_data['source'] is worker.spill
+                and worker.spill.scanned(worker.delimiter, worker.delimiter_type) is not None):
+            self.update_file_list(tab_data['tab'])
+
+    def known_files(self, tab_data, content, delimiter, delimiter_type):
+        """
+        The files of the tab's indexed bundle or spilled paste, or the parse from update_file_list for this exact text.
+        A spilled paste that has not been scanned for this delimiter gives None; pass it to the worker to scan instead.
+        """
+        if not content:
+            source = tab_data['source']
+            if isinstance(source, ParseReverseSpill):
+                return source.scanned(delimiter, delimiter_type)
+            return source
+        if self.last_parse is not None and self.last_parse[:3] == (content, delimiter, delimiter_type):
+            return self.last_parse[3]
+        return None
+
     def reverse_parse(self, content_area, path_input, delimiter_input, delimiter_type, file_list):
         try:
-            content = content_area.toPlainText()
+            metrics = ParseReverseMetrics("parse")
+            with metrics.stage("extract"):
+                content = content_area.content()
             path = path_input.currentText()
 
-            if not content:
+            tab_data = next((t for t in self.tabs if t['content_area'] is content_area), None)
+            if tab_data is None:
+                raise ValueError("Tab not found")
+            if tab_data['pending_spill'] is not None:
+                raise ValueError("The paste is still being written to disk")
+            if not content and tab_data['source'] is None:
                 raise ValueError("Content area is empty")
             if not path:
                 raise ValueError("No output path specified")
@@ -460,62 +1356,305 @@ class ParseReverseApp(QWidget):
             if not delimiter:
                 raise ValueError("File delimiter is not specified")
 
-            files = {}
-            current_file = None
-
-            if delimiter_type == "Prefix":
-                pattern = f"^{re.escape(delimiter)}\\s*(.+\\..+)$"  # Ensure the filename has an extension
-            else:  # Surround
-                pattern = f"^{re.escape(delimiter)}\\s*(.+\\..+)\\s*{re.escape(delimiter)}$"
-
-            for line in content.split('\n'):
-                match = re.match(pattern, line.strip())
-                if match:
-                    current_file = match.group(1)
-                    if current_file:
-                        files[current_file] = ""
-                elif current_file:
-                    files[current_file] += line + '\n'
-
-            if not files:
-                raise ValueError("No files were detected in the content")
-
-            for index in range(file_list.count()):
-                item = file_list.item(index)
-                if item.checkState() == Qt.Checked:
-                    filename = item.text()
-                    file_content = files.get(filename)
-                    if not file_content.strip():
-                        continue
-
-                    file_path = os.path.join(path, filename)
-                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                    with open(file_path, 'w') as f:
-                        f.write(file_content.strip())
-
-                    self.save_parsed_item(file_content.strip())
-
-            if not self.tabs[self.tab_widget.currentIndex()]['auto_clipboard_button'].isChecked() and not self.tabs[self.tab_widget.currentIndex()]['auto_parse_button'].isChecked():
-                self.show_info("Success", f"Created {len(files)} files successfully!")
+            if tab_data['parse_worker'] is not None and tab_data['parse_worker'].isRunning():
+                raise ValueError("A parse is already running in this tab")
+
+            selected_files = file_list.checked_files()
+            files = self.known_files(tab_data, content, delimiter, delimiter_type)
+
+            spill = tab_data['source'] if files is None and isinstance(tab_data['source'], ParseReverseSpill) else None
+            worker = ParseReverseWorker(content, path, delimiter, delimiter_type, selected_files, self.db, files, metrics, spill, self)
+            worker.progress.connect(lambda done, total: self.on_parse_progress(tab_data, done, total))
+            worker.parse_finished.connect(lambda result: self.on_parse_finished(tab_data, result))
+            worker.parse_failed.connect(lambda message: self.on_parse_failed(tab_data, message))
+            worker.finished.connect(lambda: self.on_parse_worker_done(tab_data))
+            worker.finished.connect(worker.deleteLater)
+            tab_data['parse_worker'] = worker
+
+            tab_data['progress_bar'].setRange(0, max(len(selected_files), 1))
+            tab_data['progress_bar'].setValue(0)
+            tab_data['progress_bar'].setVisible(True)
+            tab_data['cancel_button'].setEnabled(True)
+            tab_data['cancel_button'].setVisible(True)
+            worker.start()
+            logging.info(f"Parse started for {len(selected_files)} selected files into {path}")
+        except Exception as e:
+            logging.error(f"Reverse Parse Error: {str(e)}")
+            self.show_tray_notification("Error during parsing: Some content could not be parsed.")
+
+    def diff_parse(self, tab):
+        try:
+            tab_data = next((t for t in self.tabs if t['tab'] == tab), None)
+            if tab_data is None:
+                raise ValueError("Tab not found")
+            if tab_data['parse_worker'] is not None and tab_data['parse_worker'].isRunning():
+                raise ValueError("A parse is already running in this tab")
+
+            content = tab_data['content_area'].content()
+            path = tab_data['path_input'].currentText()
+            delimiter = tab_data['delimiter_input'].currentText()
+            delimiter_type = tab_data['delimiter_type'].currentText()
+            if tab_data['pending_spill'] is not None:
+                raise ValueError("The paste is still being written to disk")
+            if not content and tab_data['source'] is None:
+                raise ValueError("Content area is empty")
+            if not path:
+                raise ValueError("No output path specified")
+            if not delimiter:
+                raise ValueError("File delimiter is not specified")
+
+            selected_files = tab_data['file_list'].checked_files()
+            files = self.known_files(tab_data, content, delimiter, delimiter_type)
+
+            spill = tab_data['source'] if files is None and isinstance(tab_data['source'], ParseReverseSpill) else None
+            worker = ParseReverseDiffWorker(content, path, delimiter, delimiter_type, selected_files, files, spill, self)
+            worker.progress.connect(lambda done, total: self.on_parse_progress(tab_data, done, total))
+            worker.diff_finished.connect(lambda result: self.on_diff_finished(tab_data, result))
+            worker.diff_failed.connect(lambda message: self.show_error("Diff Error", f"An error occurred while comparing with {path}: {message}"))
+            worker.finished.connect(lambda: self.on_parse_worker_done(tab_data))
+            worker.finished.connect(worker.deleteLater)
+            tab_data['parse_worker'] = worker
+
+            tab_data['progress_bar'].setRange(0, max(len(selected_files), 1))
+            tab_data['progress_bar'].setValue(0)
+            tab_data['progress_bar'].setVisible(True)
+            tab_data['cancel_button'].setEnabled(True)
+            tab_data['cancel_button'].setVisible(True)
+            worker.start()
+            logging.info(f"Diff started for {len(selected_files)} selected files against {path}")
+        except Exception as e:
+            logging.error(f"Diff Error: {str(e)}")
+            self.show_error("Diff Error", f"An error occurred while starting the diff: {str(e)}")
+
+    def on_diff_finished(self, tab_data, result):
+        try:
+            for filename, error in result['failed']:
+                logging.error(f"Diff Error: {filename}: {error}")
+            summary = (f"{len(result['new'])} new, {len(result['modified'])} modified, {len(result['unchanged'])} unchanged, "
+                       f"{len(result['failed'])} failed")
+            logging.info(f"Diff against {result['path']}: {summary}")
+            if result['cancelled']:
+                self.show_tray_notification(f"Diff cancelled: {summary}")
+                return
+            dialog = ParseReverseDiffDialog(result, summary, self)
+            dialog.setAttribute(Qt.WA_DeleteOnClose)  # Let go of the result's files once it is closed
+            dialog.exec_()
+        except Exception as e:
+            logging.error(f"Diff Finished Error: {str(e)}")
+            self.show_error("Diff Finished Error", f"An error occurred while showing the diff: {str(e)}")
+
+    def on_parse_progress(self, tab_data, done, total):
+        tab_data['progress_bar'].setMaximum(max(total, 1))
+        tab_data['progress_bar'].setValue(done)
+
+    def on_parse_finished(self, tab_data, result):
+        try:
+            self.show_metrics(tab_data, result['metrics'])
+            for filename, error in result['failed']:
+                logging.error(f"Write Error: {filename}: {error}")
+            summary = self.format_parse_summary(result)
+
+            if result['cancelled']:
+                logging.info(f"Parse cancelled in {result['path']}: {summary}")
+                self.show_tray_notification(f"Parse cancelled: {summary}")
+                return
+
+            if not tab_data['auto_clipboard_button'].isChecked() and not tab_data['auto_parse_button'].isChecked():
+                if result['failed']:
+                    self.show_error("Parse Error", f"Some files could not be written: {summary}")
+                else:
+                    self.show_info("Success", f"Created {result['written']} files successfully! ({summary})")
             else:
-                self.show_tray_notification("Content parsed and saved")
+                self.show_tray_notification(f"Content parsed and saved: {summary}")
 
-            logging.info(f"Files parsed and saved to {path}")
+            logging.info(f"Files parsed and saved to {result['path']}")
         except Exception as e:
-            logging.error(f"Reverse Parse Error: {str(e)}")
+            logging.error(f"Parse Finished Error: {str(e)}")
+            self.show_error("Parse Finished Error", f"An error occurred while reporting the parse result: {str(e)}")
+
+    def show_metrics(self, tab_data, metrics):
+        tab_data['metrics_label'].setText(format_metrics(metrics))
+        tab_data['metrics_label'].setVisible(True)
+        logging.debug(format_metrics(metrics))
+
+    def format_parse_summary(self, result):
+        return f"{result['written']} written, {result['skipped']} unchanged, {len(result['failed'])} failed"
+
+    def enqueue_auto_parse(self, tab_data, content):
+        try:
+            path = tab_data['path_input'].currentText()
+            delimiter = tab_data['delimiter_input'].currentText()
+            if not content:
+                return
+            if not path:
+                raise ValueError("No output path specified")
+            if not delimiter:
+                raise ValueError("File delimiter is not specified")
+
+            job = {
+                'content': content,
+                'path': path,
+                'delimiter': delimiter,
+                'delimiter_type': tab_data['delimiter_type'].currentText()
+            }
+            # The newest bundle for a folder replaces any that is still waiting
+            if self.auto_parse_queue.put(os.path.normcase(os.path.abspath(path)), job):
+                logging.info(f"Superseded a pending auto parse for {path}")
+            if self.auto_parse_worker is None:
+                self.auto_parse_worker = ParseReverseAutoParseWorker(self.auto_parse_queue, self.db, self)
+                self.auto_parse_worker.job_finished.connect(self.on_auto_parse_finished)
+                self.auto_parse_worker.job_failed.connect(self.on_auto_parse_failed)
+                self.auto_parse_worker.queue_changed.connect(self.on_auto_parse_queue_changed)
+                self.auto_parse_worker.start()
+            self.on_auto_parse_queue_changed(self.auto_parse_queue.stats())
+        except Exception as e:
+            logging.error(f"Auto Parse Error: {str(e)}")
             self.show_tray_notification("Error during parsing: Some content could not be parsed.")
 
-    def save_parsed_item(self, content):
+    def on_auto_parse_finished(self, result):
+        for filename, error in result['failed']:
+            logging.error(f"Write Error: {filename}: {error}")
+        summary = self.format_parse_summary(result)
+        folder = os.path.normcase(os.path.abspath(result['path']))
+        for tab_data in self.tabs:
+            if os.path.normcase(os.path.abspath(tab_data['path_input'].currentText() or '.')) == folder:
+                self.show_metrics(tab_data, result['metrics'])
+        self.show_tray_notification(f"Content parsed and saved: {summary}")
+        logging.info(f"Files parsed and saved to {result['path']} using '{result['delimiter']}' ({result['delimiter_type']}): {summary}")
+
+    def on_auto_parse_failed(self, path, message):
+        logging.error(f"Auto Parse Error for {path}: {message}")
+        self.show_tray_notification("Error during parsing: Some content could not be parsed.")
+
+    def on_auto_parse_queue_changed(self, stats):
+        text = f"Auto Parse queue: {stats['depth']} pending, {stats['processed']} done, {stats['dropped']} superseded"
+        for tab_data in self.tabs:
+            if tab_data['auto_parse_button'].isChecked():
+                tab_data['queue_label'].setText(text)
+                tab_data['queue_label'].setVisible(True)
+            else:
+                tab_data['queue_label'].setVisible(False)
+
+    def on_parse_failed(self, tab_data, message):
+        logging.error(f"Reverse Parse Error: {message}")
+        self.show_tray_notification("Error during parsing: Some content could not be parsed.")
+
+    def on_parse_worker_done(self, tab_data):
+        tab_data['progress_bar'].setVisible(False)
+        tab_data['cancel_button'].setVisible(False)
+        tab_data['parse_worker'] = None
+
+    def bundle_folder(self, tab, to_clipboard=False):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''INSERT INTO parsed_items (content) VALUES (?)''', (content,))
-            conn.commit()
-            conn.close()
-            logging.info(f"Parsed item saved to database")
+            tab_data = next((t for t in self.tabs if t['tab'] == tab), None)
+            if tab_data is None:
+                raise ValueError("Tab not found")
+            if tab_data['parse_worker'] is not None and tab_data['parse_worker'].isRunning():
+                raise ValueError("A parse is already running in this tab")
+
+            path = tab_data['path_input'].currentText()
+            if not path:
+                raise ValueError("No folder specified")
+
+            bundler = ParseReverseBundler(path, tab_data['delimiter_input'].currentText(), tab_data['delimiter_type'].currentText(),
+                                          include=parse_globs(tab_data['include_input'].text()),
+                                          exclude=parse_globs(tab_data['exclude_input'].text()))
+
+            output_path = None
+            if not to_clipboard:
+                output_path, _ = QFileDialog.getSaveFileName(self, "Save Bundle", "", "Text Files (*.txt);;All Files (*)")
+                if not output_path:
+                    return
+
+            # Only re-read files whose size or mtime changed since the last bundle of this folder
+            index = ParseReverseBundleIndex(self.db, path)
+            worker = ParseReverseBundleWorker(bundler, output_path, index, self)
+            worker.progress.connect(lambda done, total: self.on_parse_progress(tab_data, done, total))
+            worker.bundle_finished.connect(lambda result: self.on_bundle_finished(tab_data, result))
+            worker.bundle_failed.connect(lambda message: self.show_error("Bundle Error", f"An error occurred while bundling the folder: {message}"))
+            worker.finished.connect(lambda: self.on_parse_worker_done(tab_data))
+            worker.finished.connect(worker.deleteLater)
+            tab_data['parse_worker'] = worker
+
+            tab_data['progress_bar'].setRange(0, 0)  # Busy until the walk knows the file count
+            tab_data['progress_bar'].setVisible(True)
+            tab_data['cancel_button'].setEnabled(True)
+            tab_data['cancel_button'].setVisible(True)
+            worker.start()
+            logging.info(f"Bundling started for {path}")
+        except Exception as e:
+            logging.error(f"Bundle Folder Error: {str(e)}")
+            self.show_error("Bundle Folder Error", f"An error occurred while bundling the folder: {str(e)}")
+
+    def on_bundle_finished(self, tab_data, result):
+        try:
+            self.show_metrics(tab_data, result['metrics'])
+            for relpath, error in result['failed']:
+                logging.error(f"Read Error: {relpath}: {error}")
+            summary = (f"{result['bundled']} files bundled ({result['cached']} unchanged), {len(result['binary'])} binary and "
+                       f"{len(result['unmarkable'])} without an extension skipped, {len(result['failed'])} failed")
+
+            if result['cancelled']:
+                logging.info(f"Bundle cancelled: {summary}")
+                self.show_tray_notification("Bundle cancelled")
+                return
+
+            if result['output_path'] is None:
+                # Keep Auto Clipboard from pulling our own bundle straight back into a tab
+                fingerprint = clipboard_fingerprint(result['text'])
+                for t in self.tabs:
+                    t['last_clipboard_fingerprint'] = fingerprint
+                self.clipboard.setText(result['text'])
+                self.show_info("Success", f"Bundle copied to clipboard: {summary}")
+            else:
+                self.show_info("Success", f"Bundle saved to {result['output_path']}: {summary}")
+            logging.info(f"Bundle complete: {summary}")
+        except Exception as e:
+            logging.error(f"Bundle Finished Error: {str(e)}")
+            self.show_error("Bundle Finished Error", f"An error occurred while reporting the bundle result: {str(e)}")
+
+    def cancel_parse(self, tab):
+        try:
+            tab_data = next((t for t in self.tabs if t['tab'] == tab), None)
+            if tab_data is None:
+                raise ValueError("Tab not found")
+            if tab_data['parse_worker'] is not None:
+                tab_data['parse_worker'].requestInterruption()
+                tab_data['cancel_button'].setEnabled(False)
+                logging.info("Parse cancellation requested")
         except Exception as e:
-            logging.error(f"Save Parsed Item Error: {str(e)}")
-            self.show_error("Save Parsed Item Error", f"An error occurred while saving parsed item: {str(e)}")
+            logging.error(f"Cancel Parse Error: {str(e)}")
+            self.show_error("Cancel Parse Error", f"An error occurred while cancelling the parse: {str(e)}")
+
+    def stop_parse_worker(self, tab_data):
+        worker = tab_data['parse_worker']
+        if worker is not None and worker.isRunning():
+            worker.requestInterruption()
+            worker.wait()
+        for scan_worker in list(tab_data['scan_workers']):
+            # A spill write stops at the next chunk; a scan cannot be interrupted, but it only takes a pass over the file
+            scan_worker.requestInterruption()
+            scan_worker.wait()
+
+    def closeEvent(self, event):
+        for tab_data in self.tabs:
+            self.cancel_spill(tab_data)
+            self.stop_parse_worker(tab_data)
+            self.stop_watch(tab_data, wait=True)  # Its parses write to the database, which is closed below
+            self.set_source(tab_data, None)
+        if self.log_file_listener is not None:
+            self.log_file_listener.stop()
+        self.auto_parse_queue.close()
+        if self.auto_parse_worker is not None:
+            self.auto_parse_worker.requestInterruption()
+            self.auto_parse_worker.wait()
+        if self.history_dialog is not None:
+            self.history_dialog.done(0)  # Waits for a running restore before the database closes
+        if self.backfill_worker is not None and self.backfill_worker.isRunning():
+            self.backfill_worker.requestInterruption()  # Stops after the current batch; the rest is done next start
+            self.backfill_worker.wait()
+        self.db.close()
+        super().closeEvent(event)
 
     def show_error(self, title, message):
         logging.error(f"{title}: {message}")
@@ -525,29 +1664,157 @@ class ParseReverseApp(QWidget):
         logging.info(f"{title}: {message}")
         QMessageBox.information(self, title, message)
 
-    def copy_from_clipboard(self, content_area):
+    def copy_from_clipboard(self, content_area=None):
         try:
+            tab_data = self.tabs[self.tab_widget.currentIndex()]
+            if not content_area:  # The menu action passes its checked state instead of a widget
+                content_area = tab_data['content_area']
             clipboard_content = self.clipboard.text()
-            if clipboard_content != content_area.toPlainText():
-                content_area.setPlainText(clipboard_content)
-                self.tabs[self.tab_widget.currentIndex()]['last_clipboard_content'] = clipboard_content
+            if clipboard_content != content_area.content():
+                self.load_content(tab_data, clipboard_content)
+                tab_data['last_clipboard_fingerprint'] = clipboard_fingerprint(clipboard_content)
                 logging.info(f"Content copied from clipboard")
         except Exception as e:
             logging.error(f"Copy from Clipboard Error: {str(e)}")
             self.show_error("Copy from Clipboard Error", f"An error occurred while copying from clipboard: {str(e)}")
 
-    def save_content(self, content_area):
+    def load_content(self, tab_data, text):
+        """
+        Show text in the tab's editor. Over the memory budget it is shown as a preview and spilled to a temp file on
+        a worker, which scans it for the current delimiter straight away.
+        """
+        self.cancel_spill(tab_data)
+        if not exceeds_budget(text):
+            tab_data['content_area'].set_content(text)
+            return
+        self.set_source(tab_data, None)
+        tab_data['content_area'].set_preview(text[:PREVIEW_CHARS], f"Large paste: writing {len(text):,} characters to disk...")
+        worker = ParseReverseScanWorker(None, tab_data['delimiter_input'].currentText(), tab_data['delimiter_type'].currentText(),
+                                        text, self)
+        worker.spilled.connect(lambda spill: self.on_spilled(tab_data, worker, spill))
+        tab_data['pending_spill'] = worker
+        self.start_scan_worker(tab_data, worker)
+
+    def cancel_spill(self, tab_data):
+        """ Stop writing a paste that has been replaced; on_spilled removes the file if it was already written """
+        worker = tab_data['pending_spill']
+        if worker is not None:
+            worker.requestInterruption()
+            tab_data['pending_spill'] = None
+
+    def clear_content(self, tab):
+        tab_data = next((t for t in self.tabs if t['tab'] == tab), None)
+        if tab_data is not None:
+            self.cancel_spill(tab_data)
+            self.set_source(tab_data, None)
+            tab_data['content_area'].clear()
+
+    def set_source(self, tab_data, source):
+        """ Replace the tab's indexed bundle or spilled paste, closing the old one once no worker is reading it """
+        old = tab_data['source']
+        tab_data['source'] = source
+        if old is None or old is source:
+            return
+        files = tab_data['file_list'].files
+        if files is old or (isinstance(old, ParseReverseSpill) and any(files is scanned for scanned in old.cache.values())):
+            tab_data['file_list'].set_files({})  # Its rows would read from the closed mapping
+        self.close_after(old, [tab_data['parse_worker']] + tab_data['scan_workers'])
+
+    def close_after(self, source, workers):
+        """ Close source now, or once the workers among these that are still running have all finished """
+        running = [worker for worker in workers if worker is not None and worker.isRunning()]
+        if not running:
+            source.close()
+            return
+        remaining = [len(running)]
+
+        def release():
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                source.close()
+        for worker in running:
+            worker.finished.connect(release)
+
+    def save_content(self, content_area=None):
         try:
-            file_name, _ = QFileDialog.getSaveFileName(self, "Save File", "", "Text Files (*.txt);;All Files (*)")
+            if not content_area:  # The menu action passes its checked state instead of a widget
+                content_area = self.tabs[self.tab_widget.currentIndex()]['content_area']
+            file_name, _ = QFileDialog.getSaveFileName(self, "Save File", "",
+                                                       f"Text Files (*.txt);;Indexed Bundles (*{INDEXED_EXTENSION});;All Files (*)")
             if file_name:
-                with open(file_name, 'w') as f:
-                    f.write(content_area.toPlainText())
+                tab_data = next(t for t in self.tabs if t['content_area'] is content_area)
+                if tab_data['pending_spill'] is not None:
+                    raise ValueError("The paste is still being written to disk")
+                source = tab_data['source']
+                bundle = source if isinstance(source, ParseReverseIndexedBundle) else None
+                spill = source if isinstance(source, ParseReverseSpill) else None
+                if bundle is not None and os.path.exists(file_name) and os.path.samefile(bundle.path, file_name):
+                    if not file_name.endswith(INDEXED_EXTENSION):
+                        raise ValueError("The indexed bundle open in this tab cannot be overwritten with plain text")
+                    logging.info(f"{file_name} is the indexed bundle open in this tab, nothing to save")
+                elif file_name.endswith(INDEXED_EXTENSION):
+                    if bundle is not None:
+                        shutil.copyfile(bundle.path, file_name)  # Already indexed
+                        count = len(bundle)
+                    else:
+                        content = spill.text() if spill is not None else content_area.content()
+                        count = write_indexed_bundle(file_name, content, tab_data['delimiter_input'].currentText(),
+                                                     tab_data['delimiter_type'].currentText())
+                    logging.info(f"Indexed {count} files in {file_name}")
+                elif spill is not None:
+                    shutil.copyfile(spill.path, file_name)  # Already on disk as UTF-8, no need to decode it
+                else:
+                    with open(file_name, 'w') as f:
+                        f.write(bundle.text() if bundle is not None else content_area.content())
                 self.show_info("Success", "Content saved successfully!")
                 logging.info(f"Content saved to {file_name}")
         except Exception as e:
             logging.error(f"Save Error: {str(e)}")
             self.show_error("Save Error", f"An error occurred while saving the content: {str(e)}")
 
+    def open_indexed_bundle(self):
+        try:
+            file_name, _ = QFileDialog.getOpenFileName(self, "Open Indexed Bundle", "",
+                                                       f"Indexed Bundles (*{INDEXED_EXTENSION});;All Files (*)")
+            if not file_name:
+                return
+            tab_data = self.tabs[self.tab_widget.currentIndex()]
+            # Only the index is read; checked files are pulled out of the bundle when the tab is parsed
+            bundle = ParseReverseIndexedBundle(file_name)
+            tab_data['content_area'].set_content("")
+            self.set_source(tab_data, bundle)
+            tab_data['delimiter_type'].setCurrentText(bundle.delimiter_type)
+            tab_data['delimiter_input'].setCurrentText(bundle.delimiter)
+            self.update_file_list(tab_data['tab'])
+            logging.info(f"Opened indexed bundle {file_name} with {len(bundle)} files")
+        except Exception as e:
+            logging.error(f"Open Indexed Bundle Error: {str(e)}")
+            self.show_error("Open Indexed Bundle Error", f"An error occurred while opening the indexed bundle: {str(e)}")
+
+    def show_history(self):
+        try:
+            if self.history_dialog is None:
+                self.history_dialog = ParseReverseHistoryDialog(self.db, self)
+            else:
+                self.history_dialog.search()  # Pick up runs recorded since it was last open
+            self.history_dialog.show()
+            self.history_dialog.raise_()
+            self.history_dialog.activateWindow()
+        except Exception as e:
+            logging.error(f"History Error: {str(e)}")
+            self.show_error("History Error", f"An error occurred while opening the history: {str(e)}")
+
+    def export_metrics(self):
+        try:
+            file_name, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "parse_metrics.json", "JSON Files (*.json);;All Files (*)")
+            if file_name:
+                count = export_runs(file_name)
+                self.show_info("Success", f"Exported metrics for {count} recent runs")
+                logging.info(f"Metrics for {count} runs exported to {file_name}")
+        except Exception as e:
+            logging.error(f"Export Metrics Error: {str(e)}")
+            self.show_error("Export Metrics Error", f"An error occurred while exporting the metrics: {str(e)}")
+
     def toggle_auto_clipboard(self, tab=None):
         try:
             current_tab_index = self.tab_widget.currentIndex()
@@ -560,10 +1827,13 @@ class ParseReverseApp(QWidget):
 
             tab_data['auto_clipboard'] = tab_data['auto_clipboard_button'].isChecked()
             if tab_data['auto_clipboard']:
-                tab_data['auto_clipboard_timer'].start(1000)  # Check every second
+                self.clipboard_watcher.subscribe(tab_data['clipboard_callback'])
+                # Pick up whatever is on the clipboard right now, as the first poll used to
+                text = self.clipboard.text()
+                self.check_clipboard(tab_data, text, clipboard_fingerprint(text))
                 logging.info("Auto Clipboard enabled")
             else:
-                tab_data['auto_clipboard_timer'].stop()
+                self.clipboard_watcher.unsubscribe(tab_data['clipboard_callback'])
                 logging.info("Auto Clipboard disabled")
         except Exception as e:
             logging.error(f"Toggle Auto Clipboard Error: {str(e)}")
@@ -587,11 +1857,13 @@ class ParseReverseApp(QWidget):
                         tab_data['auto_parse_button'].setChecked(False)
                         tab_data['auto_parse'] = False
                 else:
-                    tab_data['check_folder_timer'].timeout.connect(lambda: self.check_folder(tab_data))
                     tab_data['check_folder_timer'].start(10000)  # Check every 10 seconds
+                    if tab_data['inbox_input'].text():
+                        self.start_watch(tab_data)
                 logging.info("Auto Parse enabled")
             else:
                 tab_data['check_folder_timer'].stop()
+                self.stop_watch(tab_data)
                 logging.info("Auto Parse disabled")
         except Exception as e:
             logging.error(f"Toggle Auto Parse Error: {str(e)}")
@@ -602,25 +1874,77 @@ class ParseReverseApp(QWidget):
             if not os.path.isdir(tab_data['path_input'].currentText()):
                 tab_data['auto_parse_button'].setChecked(False)
                 tab_data['auto_parse'] = False
+                tab_data['check_folder_timer'].stop()
+                self.stop_watch(tab_data)
                 self.show_error("Invalid Folder", "The selected folder is not valid.")
-            logging.info(f"Folder checked: {tab_data['path_input'].currentText()}")
+            logging.debug(f"Folder checked: {tab_data['path_input'].currentText()}")
         except Exception as e:
             logging.error(f"Check Folder Error: {str(e)}")
             self.show_error("Check Folder Error", f"An error occurred while checking the folder: {str(e)}")
 
-    def check_clipboard(self):
+    def select_inbox(self, inbox_input):
         try:
-            current_tab_index = self.tab_widget.currentIndex()
-            if current_tab_index != -1:
-                tab = self.tabs[current_tab_index]
-                new_clipboard = self.clipboard.text()
-                if new_clipboard != tab['last_clipboard_content']:
-                    tab['last_clipboard_content'] = new_clipboard
-                    tab['content_area'].setPlainText(new_clipboard)
-                    if tab['auto_parse_button'].isChecked():
-                        self.reverse_parse(tab['content_area'], tab['path_input'], tab['delimiter_input'], tab['delimiter_type'], tab['file_list'])
-                        tab['content_area'].clear()
-                    logging.info("Clipboard content updated")
+            folder = QFileDialog.getExistingDirectory(self, "Select Inbox")
+            if folder:
+                inbox_input.setText(folder)
+            logging.info(f"Inbox selected: {folder}")
+        except Exception as e:
+            logging.error(f"Inbox Selection Error: {str(e)}")
+            self.show_error("Inbox Selection Error", f"An error occurred while selecting the inbox: {str(e)}")
+
+    def start_watch(self, tab_data):
+        try:
+            self.stop_watch(tab_data)
+            watcher = ParseReverseFolderWatcher(tab_data['inbox_input'].text(), tab_data['path_input'].currentText(),
+                                                tab_data['delimiter_input'].currentText(), tab_data['delimiter_type'].currentText(),
+                                                self.db)
+            worker = ParseReverseWatchWorker(watcher, self)
+            worker.bundle_finished.connect(lambda result: self.on_watch_finished(tab_data, result))
+            worker.bundle_failed.connect(lambda name, message: self.on_watch_failed(tab_data, name, message))
+            worker.finished.connect(lambda: self.on_watch_worker_done(tab_data, worker))
+            worker.finished.connect(worker.deleteLater)
+            tab_data['watch_worker'] = worker
+            worker.start()
+            logging.info(f"Watching {watcher.inbox} for bundles to parse into {watcher.output}")
+        except Exception as e:
+            logging.error(f"Start Watch Error: {str(e)}")
+            self.show_error("Start Watch Error", f"An error occurred while starting to watch the inbox: {str(e)}")
+
+    def stop_watch(self, tab_data, wait=False):
+        """ Ask the tab's watcher to stop; its running parses stop at their next file and finished releases it """
+        worker = tab_data['watch_worker']
+        if worker is not None:
+            worker.requestInterruption()
+            tab_data['watch_worker'] = None
+            if wait:
+                worker.wait()
+
+    def on_watch_worker_done(self, tab_data, worker):
+        if tab_data['watch_worker'] is worker:
+            tab_data['watch_worker'] = None  # Stopped by an error rather than by stop_watch
+
+    def on_watch_finished(self, tab_data, result):
+        for filename, error in result['failed']:
+            logging.error(f"Write Error: {filename}: {error}")
+        summary = self.format_parse_summary(result)
+        self.show_metrics(tab_data, result['metrics'])
+        self.show_tray_notification(f"{result['bundle']} parsed and saved: {summary}")
+        logging.info(f"Inbox bundle {result['bundle']} parsed into {result['path']}: {summary}")
+
+    def on_watch_failed(self, tab_data, name, message):
+        logging.error(f"Watch Error for {name}: {message}")
+        self.show_tray_notification(f"Error during parsing: {name} could not be parsed.")
+
+    def check_clipboard(self, tab_data, text, fingerprint):
+        try:
+            if fingerprint != tab_data['last_clipboard_fingerprint']:
+                tab_data['last_clipboard_fingerprint'] = fingerprint
+                if tab_data['auto_parse_button'].isChecked():
+                    # Straight to the background queue: the editor would only be cleared again after the parse
+                    self.enqueue_auto_parse(tab_data, text)
+                else:
+                    self.load_content(tab_data, text)
+                logging.debug("Clipboard content updated")
         except Exception as e:
             logging.error(f"Check Clipboard Error: {str(e)}")
             self.show_error("Check Clipboard Error", f"An error occurred while checking clipboard: {str(e)}")
@@ -628,6 +1952,7 @@ class ParseReverseApp(QWidget):
     def show_tutorial(self):
         try:
             tutorial = ParseReverseTutorialWindow(self)
+            tutorial.setAttribute(Qt.WA_DeleteOnClose)
             tutorial.exec_()
         except Exception as e:
             logging.error(f"Show Tutorial Error: {str(e)}")
@@ -636,6 +1961,7 @@ class ParseReverseApp(QWidget):
     def show_about(self):
         try:
             dialog = QDialog(self)
+            dialog.setAttribute(Qt.WA_DeleteOnClose)
             dialog.setWindowTitle("TSTP:PR - About")
             dialog.setFixedSize(400, 300)
 
@@ -669,6 +1995,7 @@ class ParseReverseApp(QWidget):
     def show_donate(self):
         try:
             dialog = QDialog(self)
+            dialog.setAttribute(Qt.WA_DeleteOnClose)
             dialog.setWindowTitle("TSTP:PR - Donate")
             dialog.setFixedSize(500, 300)
 
@@ -773,6 +2100,8 @@ class ParseReverseApp(QWidget):
         logging.info(f"Log {'enabled' if self.log_area.isVisible() else 'disabled'}")
 
     def show_tray_notification(self, message):
+        if self.tray_icon is None:
+            self.init_tray_icon()
         self.tray_icon.showMessage("TSTP:Parse Reverse", message, QSystemTrayIcon.Information, 10000)
 
     def toggle_notifications(self):
@@ -784,6 +2113,254 @@ class ParseReverseApp(QWidget):
         action.triggered.connect(function)
         return action
 
+class ParseReverseDiffDialog(QDialog):
+    """ Lists what a parse would change; the line diff of a file is computed on a worker thread when it is selected """
+    STATUS_LABELS = [('modified', "M"), ('new', "A"), ('unchanged', " ")]
+
+    def __init__(self, result, summary, parent=None):
+        super().__init__(parent)
+        self.result = result
+        self.diffs = {}
+        self.workers = []
+        self.setWindowTitle(f"TSTP:PR - Changes in {result['path']}")
+        self.setGeometry(150, 150, 900, 600)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.addWidget(QLabel(summary))
+
+        self.show_unchanged = QCheckBox("Show unchanged files")
+        self.show_unchanged.stateChanged.connect(self.populate)
+        layout.addWidget(self.show_unchanged)
+
+        panes = QHBoxLayout()
+        self.file_list = QListWidget()
+        self.file_list.currentItemChanged.connect(self.on_file_selected)
+        panes.addWidget(self.file_list, 1)
+
+        self.diff_view = QPlainTextEdit()
+        self.diff_view.setReadOnly(True)
+        self.diff_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        panes.addWidget(self.diff_view, 2)
+        layout.addLayout(panes)
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        layout.addWidget(close_button)
+
+        self.populate()
+
+    def populate(self):
+        self.file_list.clear()
+        for status, label in self.STATUS_LABELS:
+            if status == 'unchanged' and not self.show_unchanged.isChecked():
+                continue
+            for filename in self.result[status]:
+                item = QListWidgetItem(f"{label}  {filename}")
+                item.setData(Qt.UserRole, filename)
+                self.file_list.addItem(item)
+
+    def on_file_selected(self, item, previous=None):
+        if item is None:
+            self.diff_view.clear()
+            return
+        filename = item.data(Qt.UserRole)
+        if filename in self.diffs:
+            self.diff_view.setPlainText(self.diffs[filename])
+            return
+        self.diff_view.setPlainText("Computing diff...")
+        worker = ParseReverseFileDiffWorker(self.result['path'], filename, self.result['files'][filename], self)
+        worker.diff_ready.connect(self.on_diff_ready)
+        worker.finished.connect(lambda: self.workers.remove(worker))
+        worker.finished.connect(worker.deleteLater)
+        self.workers.append(worker)
+        worker.start()
+
+    def on_diff_ready(self, filename, text):
+        self.diffs[filename] = text
+        item = self.file_list.currentItem()
+        if item is not None and item.data(Qt.UserRole) == filename:
+            self.diff_view.setPlainText(text)
+
+    def done(self, result):
+        for worker in list(self.workers):
+            worker.wait()
+        super().done(result)
+
+class ParseReverseHistoryDialog(QDialog):
+    """ Searches the files of past parse runs and writes any recorded version of them back to disk """
+    PREVIEW_LIMIT = 1024 * 1024
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.worker = None
+        self.setWindowTitle("TSTP:PR - History")
+        self.setGeometry(150, 150, 1000, 650)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        search_layout = QHBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Words in the content (word* for a prefix)")
+        self.filename_input = QLineEdit()
+        self.filename_input.setPlaceholderText("File name contains")
+        self.folder_input = QLineEdit()
+        self.folder_input.setPlaceholderText("Folder")
+        search_button = QPushButton("Search")
+        search_button.clicked.connect(self.search)
+        for widget in (self.query_input, self.filename_input, self.folder_input):
+            widget.returnPressed.connect(self.search)
+            search_layout.addWidget(widget)
+        search_layout.addWidget(search_button)
+        layout.addLayout(search_layout)
+
+        panes = QHBoxLayout()
+        self.model = ParseReverseHistoryModel(db, self)
+        self.model.fetch_failed.connect(lambda message: self.status_label.setText(f"Search failed: {message}"))
+        self.model.rowsInserted.connect(self.update_status)
+        self.model.modelReset.connect(self.update_status)
+        self.view = QTreeView()
+        self.view.setModel(self.model)
+        self.view.setRootIsDecorated(False)
+        self.view.setUniformRowHeights(True)
+        self.view.setSelectionMode(QTreeView.ExtendedSelection)
+        self.view.header().setStretchLastSection(False)
+        self.view.header().setSectionResizeMode(ParseReverseHistoryModel.FILE, QHeaderView.Stretch)
+        self.view.selectionModel().currentRowChanged.connect(self.on_row_selected)
+        panes.addWidget(self.view, 3)
+
+        self.preview = QPlainTextEdit()
+        self.preview.setReadOnly(True)
+        self.preview.setLineWrapMode(QPlainTextEdit.NoWrap)
+        panes.addWidget(self.preview, 2)
+        layout.addLayout(panes)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        button_layout = QHBoxLayout()
+        restore_selected_button = QPushButton("Restore Selected...")
+        restore_selected_button.clicked.connect(self.restore_selected)
+        button_layout.addWidget(restore_selected_button)
+        restore_run_button = QPushButton("Restore Whole Run...")
+        restore_run_button.clicked.connect(self.restore_run)
+        button_layout.addWidget(restore_run_button)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.update_search_available()
+        self.search()
+
+    def update_search_available(self):
+        """ Content search stays off until the history index covers every stored file """
+        try:
+            with self.db.connection() as conn:
+                available, ready = has_history_index(conn), history_index_ready(conn)
+        except Exception as e:
+            logging.error(f"History Error: {str(e)}")
+            available = ready = False
+        self.query_input.setEnabled(ready)
+        if ready:
+            self.query_input.setPlaceholderText("Words in the content (word* for a prefix)")
+        elif available:
+            self.query_input.setPlaceholderText("Content search is available once older runs are indexed")
+        else:
+            self.query_input.setPlaceholderText("Content search is not available in this SQLite build")
+
+    def search(self):
+        self.preview.clear()
+        query = self.query_input.text().strip() if self.query_input.isEnabled() else ""
+        self.model.set_search(query or None, self.folder_input.text().strip() or None,
+                              self.filename_input.text().strip() or None)
+
+    def update_status(self, *args):
+        count = self.model.rowCount()
+        more = ", scroll for more" if self.model.canFetchMore() else ""
+        self.status_label.setText(f"{count:,} file versions{more}")
+
+    def on_row_selected(self, current, previous=None):
+        if not current.isValid():
+            self.preview.clear()
+            return
+        row = self.model.rows[current.row()]
+        try:
+            with self.db.connection() as conn:
+                content = load_parsed_item(conn, row['hash'])
+        except Exception as e:
+            logging.error(f"History Error: {str(e)}")
+            content = None
+        if content is None:
+            self.preview.setPlainText(f"The content of {row['filename']} could not be loaded")
+        elif len(content) > self.PREVIEW_LIMIT:
+            self.preview.setPlainText(content[:self.PREVIEW_LIMIT] + f"\n\n... {len(content) - self.PREVIEW_LIMIT:,} more characters")
+        else:
+            self.preview.setPlainText(content)
+
+    def selected_rows(self):
+        return [self.model.rows[index.row()] for index in sorted(self.view.selectionModel().selectedRows(), key=lambda index: index.row())]
+
+    def restore_selected(self):
+        rows = self.selected_rows()
+        if not rows:
+            QMessageBox.information(self, "Restore", "Select the file versions to restore first")
+            return
+        entries = {}
+        for row in rows:
+            entries.setdefault(row['filename'], row['hash'])  # Rows are newest first, so the newest selected version wins
+        self.restore(list(entries.items()), rows[0]['folder'])
+
+    def restore_run(self):
+        rows = self.selected_rows()
+        if not rows:
+            QMessageBox.information(self, "Restore", "Select a file of the run to restore first")
+            return
+        with self.db.connection() as conn:
+            entries = run_entries(conn, rows[0]['run_id'])
+        self.restore(entries, rows[0]['folder'])
+
+    def restore(self, entries, folder):
+        if self.worker is not None and self.worker.isRunning():
+            QMessageBox.information(self, "Restore", "A restore is already running")
+            return
+        path = QFileDialog.getExistingDirectory(self, "Restore To", folder or "")
+        if not path:
+            return
+        self.worker = ParseReverseRestoreWorker(self.db, entries, path, self)
+        self.worker.progress.connect(lambda done, total: self.progress_bar.setValue(done))
+        self.worker.restore_finished.connect(self.on_restore_finished)
+        self.worker.restore_failed.connect(lambda message: QMessageBox.critical(self, "Restore Error", f"An error occurred while restoring: {message}"))
+        self.worker.finished.connect(self.on_restore_worker_done)
+        self.progress_bar.setRange(0, max(len(entries), 1))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.worker.start()
+        logging.info(f"Restoring {len(entries)} files into {path}")
+
+    def on_restore_worker_done(self):
+        self.progress_bar.setVisible(False)
+        self.worker.deleteLater()
+        self.worker = None
+
+    def on_restore_finished(self, result):
+        for filename, error in result['failed']:
+            logging.error(f"Restore Error: {filename}: {error}")
+        summary = f"{result['written']} written, {result['skipped']} unchanged, {len(result['failed'])} failed"
+        logging.info(f"Restored into {result['path']}: {summary}")
+        QMessageBox.information(self, "Restore", f"Restored into {result['path']}: {summary}")
+
+    def done(self, result):
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.wait()
+        super().done(result)
+
 class ParseReverseTutorialWindow(QDialog):
     def __init__(self, parent=None):
         super(ParseReverseTutorialWindow, self).__init__(parent)
@@ -826,16 +2403,18 @@ class ParseReverseTutorialWindow(QDialog):
             self.setLayout(self.layout)
 
             self.current_page_index = 0
-            self.tutorial_pages = [
-                self.create_welcome_page(),
-                self.create_overview_page(),
-                self.create_select_folder_page(),
-                self.create_set_delimiter_page(),
-                self.create_parse_files_page(),
-                self.create_save_copy_page(),
-                self.create_auto_clipboard_page(),
-                self.create_error_handling_page()
+            # Pages are only built when they are first shown
+            self.page_builders = [
+                self.create_welcome_page,
+                self.create_overview_page,
+                self.create_select_folder_page,
+                self.create_set_delimiter_page,
+                self.create_parse_files_page,
+                self.create_save_copy_page,
+                self.create_auto_clipboard_page,
+                self.create_error_handling_page
             ]
+            self.tutorial_pages = {}
 
             self.load_tutorial_page(self.current_page_index)
         except Exception as e:
@@ -844,8 +2423,10 @@ class ParseReverseTutorialWindow(QDialog):
 
     def load_tutorial_page(self, index):
         try:
+            if index not in self.tutorial_pages:
+                self.tutorial_pages[index] = self.page_builders[index]()
             self.webView.setPlainText(self.tutorial_pages[index])
-            self.progress_bar.setValue(int((index + 1) / len(self.tutorial_pages) * 100))
+            self.progress_bar.setValue(int((index + 1) / len(self.page_builders) * 100))
         except Exception as e:
             logging.error(f"Loading Error: {str(e)}")
             self.show_error("Loading Error", f"Error loading tutorial page: {str(e)}")
@@ -891,7 +2472,7 @@ class ParseReverseTutorialWindow(QDialog):
 
     def go_to_next_page(self):
         try:
-            if self.current_page_index < len(self.tutorial_pages) - 1:
+            if self.current_page_index < len(self.page_builders) - 1:
                 self.current_page_index += 1
                 self.load_tutorial_page(self.current_page_index)
         except Exception as e:
@@ -984,6 +2565,12 @@ if __name__ == '__main__':
     try:
         app = QApplication(sys.argv)
         ex = ParseReverseApp()
+        if '--startup-time' in sys.argv[1:]:
+            # Print the startup timings as JSON and exit, for timing hotkey launches from a script
+            def report_startup(metrics):
+                print(json.dumps(metrics))
+                app.quit()
+            ex.ready.connect(report_startup)
         sys.exit(app.exec_())
     except Exception as e:
         logging.critical(f"Critical Error: {str(e)}")
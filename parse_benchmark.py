@@ -0,0 +1,203 @@
+"""
+Headless benchmarks for the parse, detect, write, database and history search paths.
+
+    python parse_benchmark.py --files 10000 --file-size 10000
+    python parse_benchmark.py --save-baseline
+    python parse_benchmark.py --baseline benchmark_baseline.json --threshold 0.2
+
+Bundles are generated from a fixed seed so runs are comparable. Results are printed as JSON; with a baseline,
+any benchmark slower than baseline * (1 + threshold) is reported and the exit code is 1. Each path's output is
+also checked against the generated bundle; a failed check is listed under "failures" and the exit code is 3.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+
+from parse_engine import ParseReverseEngine, detect_delimiters
+from parse_writer import ParseReverseWriter
+from parse_db import ParseReverseDatabase, save_parse_run
+from parse_bundler import format_marker
+from parse_history import search_history
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+DEFAULT_THRESHOLD = 0.2
+EXTENSIONS = [".py", ".js", ".css", ".html", ".md", ".txt"]
+# Every generated file contains this, so the history search always has something to find
+SEARCH_TOKEN = "benchmarkneedle"
+WORDS = ["def", "return", "value", "self", "import", "class", "for", "in", "if", "else", "data", "result", "=", "(", ")", ":"]
+
+
+def generate_bundle(file_count, file_size, delimiter="###", delimiter_type="Prefix", seed=0):
+    """ Build a synthetic bundle of file_count files of roughly file_size characters each """
+    rng = random.Random(seed)
+    parts = []
+    for i in range(file_count):
+        filename = f"dir{i % 50}/file{i}{EXTENSIONS[i % len(EXTENSIONS)]}"
+        lines = [f"# {SEARCH_TOKEN} {i}"]
+        size = len(lines[0]) + 1
+        while size < file_size:
+            line = "    " * rng.randint(0, 3) + " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+            lines.append(line)
+            size += len(line) + 1
+        parts.append(format_marker(delimiter, delimiter_type, filename))
+        parts.append("\n".join(lines))
+    return "\n".join(parts) + "\n"
+
+
+def time_call(func, repeat):
+    """ Run func repeat times and return (timings in seconds, last result) """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def summarize(timings):
+    return {'min_ms': round(min(timings) * 1000, 3), 'median_ms': round(statistics.median(timings) * 1000, 3), 'runs': len(timings)}
+
+
+def run_benchmarks(file_count, file_size, delimiter="###", delimiter_type="Prefix", repeat=3, seed=0):
+    """
+    Time each path on one generated bundle and return the results dict. Outputs that do not match the bundle
+    are listed under 'failures' rather than raised, so the timings of the other paths are still reported.
+    """
+    content = generate_bundle(file_count, file_size, delimiter, delimiter_type, seed)
+    results = {}
+    failures = []
+
+    timings, files = time_call(lambda: ParseReverseEngine(delimiter, delimiter_type).parse(content), repeat)
+    if len(files) != file_count:
+        failures.append(f"parse: found {len(files)} files, expected {file_count}")
+    results['parse'] = summarize(timings)
+
+    timings, _ = time_call(lambda: ParseReverseEngine(delimiter, delimiter_type).spans(content), repeat)
+    results['spans'] = summarize(timings)
+
+    timings, candidates = time_call(lambda: detect_delimiters(content, top_n=1), repeat)
+    if not candidates or candidates[0]['delimiter'] != delimiter:
+        failures.append(f"detect: found {candidates[0]['delimiter'] if candidates else 'nothing'!r}, expected {delimiter!r}")
+    results['detect'] = summarize(timings)
+
+    to_write = {filename: body.strip() for filename, body in files.items()}
+    work_dir = tempfile.mkdtemp(prefix="parse_benchmark_")
+    try:
+        timings = []
+        for run in range(repeat):
+            # A fresh folder each time; rewriting unchanged files only measures the skip check
+            writer = ParseReverseWriter(os.path.join(work_dir, f"write{run}"))
+            start = time.perf_counter()
+            writer.write_files(to_write)
+            timings.append(time.perf_counter() - start)
+        results['write'] = summarize(timings)
+
+        timings, _ = time_call(lambda: ParseReverseWriter(os.path.join(work_dir, "write0")).write_files(to_write), repeat)
+        results['write_unchanged'] = summarize(timings)
+
+        timings = []
+        for run in range(repeat):
+            db = ParseReverseDatabase(os.path.join(work_dir, f"db{run}.sqlite"))
+            try:
+                db.migrate()
+                start = time.perf_counter()
+                with db.transaction() as conn:
+                    save_parse_run(conn, work_dir, to_write)
+                timings.append(time.perf_counter() - start)
+            finally:
+                db.close()
+        results['db_store'] = summarize(timings)
+
+        db = ParseReverseDatabase(os.path.join(work_dir, "db0.sqlite"))
+        try:
+            with db.connection() as conn:
+                timings, rows = time_call(lambda: search_history(conn, SEARCH_TOKEN), repeat)
+            if not rows:
+                failures.append(f"history_search: found nothing for {SEARCH_TOKEN!r}")
+            results['history_search'] = summarize(timings)
+        finally:
+            db.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'config': {'files': file_count, 'file_size': file_size, 'delimiter': delimiter, 'delimiter_type': delimiter_type,
+                   'repeat': repeat, 'seed': seed, 'bundle_bytes': len(content.encode('utf-8'))},
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'created_at': time.time(),
+        'results': results,
+        'failures': failures
+    }
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """ Return a list of regressions: benchmarks whose min time exceeds the baseline by more than threshold """
+    if baseline.get('config') != report['config']:
+        raise ValueError("Baseline was recorded with a different configuration")
+    regressions = []
+    for name, result in report['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        ratio = result['min_ms'] / previous['min_ms'] if previous['min_ms'] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append({'benchmark': name, 'baseline_ms': previous['min_ms'], 'current_ms': result['min_ms'],
+                                'ratio': round(ratio, 3)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Reverse Parse parse, detect, write and database paths")
+    parser.add_argument("--files", type=int, default=1000, help="number of files in the generated bundle")
+    parser.add_argument("--file-size", type=int, default=2000, help="approximate characters per file")
+    parser.add_argument("--delimiter", default="###")
+    parser.add_argument("--type", dest="delimiter_type", choices=["Prefix", "Surround"], default="Prefix")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline instead of comparing")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+    if args.files < 1 or args.file_size < 1 or args.repeat < 1:
+        parser.error("--files, --file-size and --repeat must be at least 1")
+
+    report = run_benchmarks(args.files, args.file_size, args.delimiter, args.delimiter_type, args.repeat, args.seed)
+
+    status = 0
+    if report['failures']:
+        # The timings are not comparable when a path produced the wrong output, so neither save nor compare them
+        for failure in report['failures']:
+            print(f"Self-check failed: {failure}", file=sys.stderr)
+        status = 3
+    elif args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        try:
+            report['regressions'] = compare(report, baseline, args.threshold)
+        except ValueError as e:
+            report['baseline_error'] = str(e)
+        else:
+            status = 1 if report['regressions'] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
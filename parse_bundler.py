@@ -0,0 +1,269 @@
+import os
+import time
+import fnmatch
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from parse_db import MAX_QUERY_PARAMS
+from parse_engine import build_marker_pattern, parse_marker_spec
+from parse_metrics import ParseReverseMetrics, profiled, record_run
+
+DEFAULT_EXCLUDES = [".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv"]
+BINARY_SNIFF_SIZE = 8192
+# Stands for "not cached" where None already means a cached binary file
+MISSING = object()
+
+# Columns of a cached file_index row
+SIZE, MTIME_NS = range(2)
+# Cached fragments are fetched this many files at a time while bundling, so only a batch is ever held
+FRAGMENT_BATCH = 256
+
+
+def parse_globs(text):
+    """ Split a comma/semicolon separated glob list from a text field """
+    return [glob.strip() for glob in text.replace(';', ',').split(',') if glob.strip()]
+
+
+def is_binary(data):
+    return b'\0' in data[:BINARY_SNIFF_SIZE]
+
+
+def normalize_body(text):
+    if text and not text.endswith('\n'):
+        text += '\n'
+    return text
+
+
+def format_marker(delimiter, delimiter_type, filename):
+    if delimiter_type == "Prefix":
+        return f"{delimiter} {filename}"
+    return f"{delimiter} {filename} {delimiter}"
+
+
+class ParseReverseBundler:
+    """ Walks a folder and streams its text files as one bundle in the Prefix/Surround marker format """
+
+    def __init__(self, root, delimiter, delimiter_type="Prefix", include=None, exclude=None, max_workers=None):
+        if not delimiter:
+            raise ValueError("File delimiter is not specified")
+        if not os.path.isdir(root):
+            raise ValueError(f"Folder does not exist: {root}")
+        self.root = root
+        # With several delimiters configured, bundles are written with the first one
+        self.delimiter, self.delimiter_type = parse_marker_spec(delimiter, delimiter_type)[0]
+        self.include = list(include or [])
+        self.exclude = list(DEFAULT_EXCLUDES if exclude is None else exclude)
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.marker_pattern = build_marker_pattern(self.delimiter, self.delimiter_type)
+
+    def matches(self, patterns, relpath, name):
+        return any(fnmatch.fnmatch(relpath, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+    def can_mark(self, relpath):
+        # Only emit files that update_file_list will recognise again (e.g. the name needs an extension)
+        match = self.marker_pattern.match(format_marker(self.delimiter, self.delimiter_type, relpath))
+        return match is not None and match.group(1).strip() == relpath
+
+    def walk(self):
+        """ Yield (relpath, abspath, stat_result) for every candidate file, in sorted order """
+        stack = [("", self.root)]
+        while stack:
+            rel_dir, abs_dir = stack.pop()
+            try:
+                with os.scandir(abs_dir) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                relpath = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if self.exclude and self.matches(self.exclude, relpath, entry.name):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append((relpath, entry.path))
+                    elif entry.is_file():
+                        if self.include and not self.matches(self.include, relpath, entry.name):
+                            continue
+                        yield relpath, entry.path, entry.stat()
+                except OSError:
+                    continue
+            stack.extend(reversed(subdirs))
+
+    def read_file(self, abspath):
+        """ Return the file's text, or None when it is binary or not valid UTF-8 """
+        with open(abspath, 'rb') as f:
+            data = f.read()
+        if is_binary(data):
+            return None
+        try:
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+
+    def render(self, relpath, body):
+        return f"{format_marker(self.delimiter, self.delimiter_type, relpath)}\n{body}\n"
+
+    def with_fragments(self, items, index):
+        """ Yield (relpath, abspath, fragment) with the cached fragment, or MISSING, fetched FRAGMENT_BATCH files at a time """
+        items = iter(items)
+        while True:
+            batch = [item for _, item in zip(range(FRAGMENT_BATCH), items)]
+            if not batch:
+                return
+            cached = [relpath for relpath, _, is_cached in batch if is_cached]
+            fragments = index.fragments(cached) if cached and index is not None else {}
+            for relpath, abspath, _ in batch:
+                yield relpath, abspath, fragments.get(relpath, MISSING)
+
+    def read_ordered(self, items, is_cancelled=None, index=None):
+        """
+        Read files on a thread pool but yield (relpath, text, error, cached) in walk order with a bounded read-ahead.
+        items are (relpath, abspath, cached); cached files take their fragment from index instead of being read.
+        """
+        window = self.max_workers * 4
+        pending = deque()
+        items = self.with_fragments(items, index)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                while len(pending) < window:
+                    item = next(items, None)
+                    if item is None:
+                        break
+                    relpath, abspath, fragment = item
+                    future = None if fragment is not MISSING else executor.submit(self.read_file, abspath)
+                    pending.append((relpath, future, fragment))
+                if not pending:
+                    return
+                if is_cancelled is not None and is_cancelled():
+                    for _, future, _ in pending:
+                        if future is not None:
+                            future.cancel()
+                    return
+                relpath, future, fragment = pending.popleft()
+                if future is None:
+                    yield relpath, fragment, None, True
+                    continue
+                try:
+                    yield relpath, future.result(), None, False
+                except Exception as e:
+                    yield relpath, None, str(e), False
+
+    def write_to(self, write, progress=None, is_cancelled=None, index=None, metrics=None):
+        """
+        Stream the bundle through write(chunk) and return a summary dict.
+        progress(done, total) is called as files complete. With a ParseReverseBundleIndex only new or
+        changed files (by size and mtime) are read; the rest come from the cached fragments.
+        """
+        if metrics is None:
+            metrics = ParseReverseMetrics("bundle")
+        try:
+            with profiled("bundle"):
+                summary = self.bundle(write, progress, is_cancelled, index, metrics)
+            metrics.count("files", summary['bundled'])
+            metrics.count("bytes", summary['bytes'])
+            metrics.count("cached", summary['cached'])
+            metrics.count("skipped", len(summary['binary']) + len(summary['unmarkable']))
+            metrics.count("errors", len(summary['failed']))
+            summary['metrics'] = metrics.as_dict()
+            return summary
+        except Exception:
+            metrics.count("errors")
+            raise
+        finally:
+            record_run(metrics)
+
+    def bundle(self, write, progress, is_cancelled, index, metrics):
+        summary = {'bundled': 0, 'bytes': 0, 'cached': 0, 'binary': [], 'unmarkable': [], 'failed': [], 'cancelled': False}
+        with metrics.stage("index"):
+            cached_rows = index.load() if index is not None else {}
+        items = []
+        stats = {}
+        with metrics.stage("walk"):
+            for relpath, abspath, stat in self.walk():
+                if not self.can_mark(relpath):
+                    summary['unmarkable'].append(relpath)
+                    continue
+                row = cached_rows.get(relpath)
+                cached = row is not None and (row[SIZE], row[MTIME_NS]) == (stat.st_size, stat.st_mtime_ns)
+                items.append((relpath, abspath, cached))
+                stats[relpath] = stat
+
+        total = len(items)
+        step = max(1, total // 200)
+        updates = []
+        done = 0
+        with metrics.stage("read"):
+            for done, (relpath, body, error, cached) in enumerate(self.read_ordered(items, is_cancelled, index), 1):
+                if error is not None:
+                    summary['failed'].append((relpath, error))
+                else:
+                    if cached:
+                        summary['cached'] += 1
+                    else:
+                        if body is not None:
+                            body = normalize_body(body)
+                        updates.append((relpath, stats[relpath], body))
+                    if body is None:
+                        summary['binary'].append(relpath)
+                    else:
+                        chunk = self.render(relpath, body)
+                        write(chunk)
+                        summary['bundled'] += 1
+                        summary['bytes'] += len(chunk)
+                if progress is not None and (done % step == 0 or done == total):
+                    progress(done, total)
+        summary['cancelled'] = done < total
+
+        if index is not None:
+            with metrics.stage("index"):
+                index.save(updates, [relpath for relpath in cached_rows if relpath not in stats])
+        return summary
+
+
+class ParseReverseBundleIndex:
+    """ Per-folder size/mtime/hash index and fragment cache in folders.db, used for incremental re-bundling """
+
+    # Files modified this close to the scan may change again within the same mtime tick, so never trust them
+    RACY_WINDOW_NS = 2 * 10 ** 9
+
+    def __init__(self, db, folder):
+        self.db = db
+        self.folder = os.path.normcase(os.path.abspath(folder))
+
+    def load(self):
+        """ Return {relpath: (size, mtime_ns)}; the fragments stay in the database until fragments() asks for them """
+        with self.db.connection() as conn:
+            cursor = conn.execute('''SELECT relpath, size, mtime_ns FROM file_index WHERE folder = ?''', (self.folder,))
+            return {row[0]: row[1:] for row in cursor}
+
+    def fragments(self, relpaths):
+        """ Return {relpath: fragment} for those of relpaths still cached; fragment is None for binary files """
+        found = {}
+        relpaths = list(relpaths)
+        with self.db.connection() as conn:
+            for start in range(0, len(relpaths), MAX_QUERY_PARAMS):
+                batch = relpaths[start:start + MAX_QUERY_PARAMS]
+                placeholders = ', '.join('?' * len(batch))
+                found.update(conn.execute(f'''SELECT relpath, fragment FROM file_index WHERE folder = ? AND relpath IN ({placeholders})''',
+                                          [self.folder] + batch))
+        return found
+
+    def save(self, updates, candidates_removed=()):
+        """ Store (relpath, stat_result, fragment) updates and drop rows for files that no longer exist """
+        now_ns = time.time_ns()
+        rows = []
+        for relpath, stat, fragment in updates:
+            size = stat.st_size if now_ns - stat.st_mtime_ns > self.RACY_WINDOW_NS else -1
+            digest = hashlib.sha256(fragment.encode('utf-8')).hexdigest() if fragment is not None else None
+            rows.append((self.folder, relpath, size, stat.st_mtime_ns, digest, fragment))
+        # Rows missing from this walk may only be filtered out by include/exclude globs, so check the disk
+        removed = [(self.folder, relpath) for relpath in candidates_removed
+                   if not os.path.lexists(os.path.join(self.folder, relpath))]
+        if not rows and not removed:
+            return
+        with self.db.transaction() as conn:
+            conn.executemany('''INSERT OR REPLACE INTO file_index (folder, relpath, size, mtime_ns, hash, fragment)
+                                VALUES (?, ?, ?, ?, ?, ?)''', rows)
+            conn.executemany('''DELETE FROM file_index WHERE folder = ? AND relpath = ?''', removed)
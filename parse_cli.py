@@ -0,0 +1,137 @@
+"""
+Headless command line for reverse parsing bundle files, without PyQt5.
+
+    python parse_cli.py bundle.txt -o out/
+    python parse_cli.py a.txt b.txt=out/b --delimiter "###" --type Prefix --jobs 4
+    python parse_cli.py bundles/*.txt -o out/ --dry-run
+
+A bundle argument may name its target folder as BUNDLE=FOLDER; otherwise it goes to --output, or to a
+subfolder of --output named after the bundle when several bundles are given. Without --delimiter each
+bundle's delimiter is detected. A JSON summary is printed; the exit code is 0 when every bundle was
+parsed and written, 1 when any bundle or file failed and 2 for usage errors.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from parse_engine import DELIMITER_TYPES, detect_delimiters
+from parse_writer import reverse_parse_to_disk, diff_to_disk, AUTO_DETECT_CONFIDENCE
+from parse_db import ParseReverseDatabase
+from parse_logging import LOG_FORMAT
+
+EXIT_OK = 0
+EXIT_FAILED = 1  # argparse exits with 2 on usage errors
+
+
+def read_bundle(path, encoding):
+    with open(path, encoding=encoding) as f:
+        return f.read()
+
+
+def resolve_delimiter(content, delimiter, delimiter_type):
+    if delimiter:
+        return delimiter, delimiter_type
+    candidates = detect_delimiters(content, top_n=1)
+    if not candidates or candidates[0]['confidence'] < AUTO_DETECT_CONFIDENCE:
+        raise ValueError("No delimiter given and none could be detected")
+    return candidates[0]['delimiter'], candidates[0]['type']
+
+
+def dry_run(content, path, delimiter, delimiter_type):
+    """ Report what reverse_parse_to_disk would do without writing anything """
+    result = diff_to_disk(content, path, delimiter, delimiter_type)
+    del result['files']
+    result['written'] = len(result['new']) + len(result['modified'])
+    result['skipped'] = len(result.pop('unchanged'))
+    return result
+
+
+def parse_bundle(bundle, path, delimiter, delimiter_type, encoding='utf-8', dry=False, db_path=None):
+    """ Reverse parse one bundle file; runs in a pool process, so it takes and returns plain values """
+    try:
+        content = read_bundle(bundle, encoding)
+        delimiter, delimiter_type = resolve_delimiter(content, delimiter, delimiter_type)
+        if dry:
+            result = dry_run(content, path, delimiter, delimiter_type)
+        else:
+            db = ParseReverseDatabase(db_path) if db_path else None
+            try:
+                result = reverse_parse_to_disk(content, path, delimiter, delimiter_type, db=db)
+            finally:
+                if db is not None:
+                    db.close()
+        result['failed'] = [{'filename': filename, 'error': error} for filename, error in result['failed']]
+        result['ok'] = not result['failed']
+    except Exception as e:
+        result = {'path': path, 'ok': False, 'error': str(e)}
+    result['bundle'] = bundle
+    return result
+
+
+def plan_targets(bundles, output):
+    """ Pair every BUNDLE or BUNDLE=FOLDER argument with its target folder """
+    targets = []
+    for argument in bundles:
+        bundle, separator, folder = argument.partition('=')
+        if not separator:
+            if output is None:
+                raise ValueError(f"No target folder for {bundle}: use --output or BUNDLE=FOLDER")
+            folder = output
+            if len(bundles) > 1:
+                folder = os.path.join(output, os.path.splitext(os.path.basename(bundle))[0])
+        targets.append((bundle, folder))
+    return targets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reverse parse bundle files into folders without the GUI")
+    parser.add_argument("bundles", nargs='+', metavar="BUNDLE[=FOLDER]", help="bundle file, optionally with its target folder")
+    parser.add_argument("-o", "--output", help="target folder (a subfolder per bundle when several are given)")
+    parser.add_argument("-d", "--delimiter", help="file delimiter; several as '### | <!--:Surround'. Detected when omitted")
+    parser.add_argument("-t", "--type", dest="delimiter_type", choices=DELIMITER_TYPES, default="Prefix")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="bundles parsed in parallel processes")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="report the files that would be written")
+    parser.add_argument("--encoding", default="utf-8", help="encoding of the bundle files")
+    parser.add_argument("--db", help="record the runs in this folders.db")
+    parser.add_argument("--summary", help="also write the JSON summary to this file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format=LOG_FORMAT, stream=sys.stderr)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    try:
+        targets = plan_targets(args.bundles, args.output)
+    except ValueError as e:
+        parser.error(str(e))
+
+    options = (args.delimiter, args.delimiter_type, args.encoding, args.dry_run, args.db)
+    if args.jobs == 1 or len(targets) == 1:
+        results = [parse_bundle(bundle, folder, *options) for bundle, folder in targets]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = [executor.submit(parse_bundle, bundle, folder, *options) for bundle, folder in targets]
+            results = [future.result() for future in futures]
+
+    for result in results:
+        if result['ok']:
+            logging.info(f"{result['bundle']}: {result['written']} written, {result['skipped']} unchanged into {result['path']}")
+        else:
+            error = result.get('error') or f"{len(result['failed'])} files failed"
+            logging.error(f"{result['bundle']}: {error}")
+
+    failed = sum(1 for result in results if not result['ok'])
+    summary = {'dry_run': args.dry_run, 'bundles': len(results), 'ok': len(results) - failed, 'failed': failed, 'results': results}
+    text = json.dumps(summary, indent=2)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
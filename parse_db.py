@@ -0,0 +1,322 @@
+import os
+import time
+import zlib
+import queue
+import hashlib
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+COMPRESSION_LEVEL = 6
+# Stay well below SQLite's default limit on host parameters per statement
+MAX_QUERY_PARAMS = 500
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def compress_content(content):
+    return zlib.compress(content.encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decompress_content(blob):
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def create_parsed_items_tables(conn):
+    """
+    Content-addressed parsed_items plus the runs that produced them. The old (id, content) table is renamed to
+    parsed_items_legacy; its rows are moved over later by backfill_legacy_items, in batches, off the startup path.
+    """
+    columns = [row[1] for row in conn.execute('''PRAGMA table_info(parsed_items)''')]
+    rename = bool(columns) and 'hash' not in columns
+    if rename:
+        conn.execute('''ALTER TABLE parsed_items RENAME TO parsed_items_legacy''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS parsed_items (hash TEXT PRIMARY KEY, size INTEGER NOT NULL, content BLOB NOT NULL)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS parse_runs (id INTEGER PRIMARY KEY, folder TEXT, created_at REAL NOT NULL)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS parse_run_files (run_id INTEGER NOT NULL REFERENCES parse_runs(id),
+                    filename TEXT NOT NULL, hash TEXT NOT NULL REFERENCES parsed_items(hash), PRIMARY KEY (run_id, filename))''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS parse_run_files_hash ON parse_run_files (hash)''')
+
+
+def has_table(conn, name):
+    return conn.execute('''SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?''', (name,)).fetchone() is not None
+
+
+def backfill_legacy_items(conn, batch=MAX_QUERY_PARAMS):
+    """ Move one batch of parsed_items_legacy into parsed_items; returns False once nothing is left """
+    if not has_table(conn, 'parsed_items_legacy'):
+        return False
+    rows = conn.execute('''SELECT rowid, content FROM parsed_items_legacy ORDER BY rowid LIMIT ?''', (batch,)).fetchall()
+    if not rows:
+        conn.execute('''DROP TABLE parsed_items_legacy''')
+        return False
+    # Old rows have no filename or folder, so they only survive as deduplicated blobs
+    insert_blobs(conn, {content_hash(content): content for _, content in rows if content})
+    conn.execute('''DELETE FROM parsed_items_legacy WHERE rowid <= ?''', (rows[-1][0],))
+    return True
+
+
+def existing_hashes(conn, hashes):
+    found = set()
+    hashes = list(hashes)
+    for start in range(0, len(hashes), MAX_QUERY_PARAMS):
+        batch = hashes[start:start + MAX_QUERY_PARAMS]
+        placeholders = ', '.join('?' * len(batch))
+        found.update(row[0] for row in conn.execute(f'''SELECT hash FROM parsed_items WHERE hash IN ({placeholders})''', batch))
+    return found
+
+
+def insert_blobs(conn, blobs):
+    """ Store {hash: content}, compressing only the bodies that are not stored yet, and add them to the history index """
+    stored = existing_hashes(conn, blobs)
+    new = [(digest, content) for digest, content in blobs.items() if digest not in stored]
+    conn.executemany('''INSERT OR IGNORE INTO parsed_items (hash, size, content) VALUES (?, ?, ?)''',
+                     ((digest, len(content), compress_content(content)) for digest, content in new))
+    if new and has_history_index(conn):
+        conn.executemany('''INSERT INTO parsed_items_fts (rowid, content) SELECT rowid, ? FROM parsed_items WHERE hash = ?''',
+                         ((content, digest) for digest, content in new))
+
+
+def create_parse_run(conn, folder):
+    return conn.execute('''INSERT INTO parse_runs (folder, created_at) VALUES (?, ?)''', (folder, time.time())).lastrowid
+
+
+def add_parse_run_files(conn, run_id, files):
+    """ Store {filename: content} under an existing run """
+    filenames = list(files)
+    # In batches, so a lazy mapping of files never has every text in memory at once
+    for start in range(0, len(filenames), MAX_QUERY_PARAMS):
+        blobs = {}
+        rows = []
+        for filename in filenames[start:start + MAX_QUERY_PARAMS]:
+            content = files[filename]
+            digest = content_hash(content)
+            blobs[digest] = content
+            rows.append((run_id, filename, digest))
+        insert_blobs(conn, blobs)
+        conn.executemany('''INSERT OR REPLACE INTO parse_run_files (run_id, filename, hash) VALUES (?, ?, ?)''', rows)
+
+
+def save_parse_run(conn, folder, files):
+    """ Record one reverse_parse run of {filename: content} and return its run id; call inside ParseReverseDatabase.transaction() """
+    run_id = create_parse_run(conn, folder)
+    add_parse_run_files(conn, run_id, files)
+    return run_id
+
+
+def load_parsed_item(conn, digest):
+    row = conn.execute('''SELECT content FROM parsed_items WHERE hash = ?''', (digest,)).fetchone()
+    return decompress_content(row[0]) if row else None
+
+
+def has_history_index(conn):
+    """ Whether parsed_items_fts exists, so new bodies should be added to it """
+    return has_table(conn, 'parsed_items_fts')
+
+
+def history_index_ready(conn):
+    """ Whether parsed_items_fts exists and covers every stored body, i.e. content search gives complete results """
+    if not has_history_index(conn):
+        return False
+    return not has_table(conn, 'history_backfill') or conn.execute('''SELECT 1 FROM history_backfill''').fetchone() is None
+
+
+def create_history_tables(conn):
+    """
+    The parse_history view (one row per file of every run) and parsed_items_fts, a full-text index over every stored body.
+    The index is contentless and keyed by parsed_items.rowid, since the bodies are already stored compressed.
+    New bodies are indexed as they are stored; the ones already there are left to backfill_history_index.
+    """
+    conn.execute('''CREATE INDEX IF NOT EXISTS parse_runs_folder ON parse_runs (folder)''')
+    conn.execute('''CREATE VIEW IF NOT EXISTS parse_history AS
+                    SELECT f.run_id, r.folder, f.filename, r.created_at, f.hash, i.size
+                    FROM parse_run_files f JOIN parse_runs r ON r.id = f.run_id JOIN parsed_items i ON i.hash = f.hash''')
+    try:
+        conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS parsed_items_fts USING fts5 (content, content='')''')
+    except sqlite3.OperationalError as e:
+        # Some SQLite builds ship without FTS5; history then works without content search
+        logging.warning(f"Full-text history search is not available: {str(e)}")
+        return
+    # Rows up to end_rowid predate the index; next_rowid is how far backfill_history_index has got
+    conn.execute('''CREATE TABLE IF NOT EXISTS history_backfill (next_rowid INTEGER NOT NULL, end_rowid INTEGER NOT NULL)''')
+    end_rowid = conn.execute('''SELECT coalesce(max(rowid), 0) FROM parsed_items''').fetchone()[0]
+    if end_rowid and conn.execute('''SELECT 1 FROM history_backfill''').fetchone() is None:
+        conn.execute('''INSERT INTO history_backfill (next_rowid, end_rowid) VALUES (0, ?)''', (end_rowid,))
+
+
+def backfill_history_index(conn, batch=MAX_QUERY_PARAMS):
+    """ Index one batch of the bodies stored before parsed_items_fts existed; returns False once the index is complete """
+    if not has_history_index(conn):
+        return False
+    state = conn.execute('''SELECT next_rowid, end_rowid FROM history_backfill''').fetchone()
+    if state is None:
+        return False
+    next_rowid, end_rowid = state
+    rows = conn.execute('''SELECT rowid, content FROM parsed_items WHERE rowid > ? AND rowid <= ? ORDER BY rowid LIMIT ?''',
+                        (next_rowid, end_rowid, batch)).fetchall()
+    conn.executemany('''INSERT INTO parsed_items_fts (rowid, content) VALUES (?, ?)''',
+                     ((rowid, decompress_content(blob)) for rowid, blob in rows))
+    if len(rows) < batch:
+        conn.execute('''DELETE FROM history_backfill''')
+        return False
+    conn.execute('''UPDATE history_backfill SET next_rowid = ?''', (rows[-1][0],))
+    return True
+
+
+# Data migrations too slow for startup; ParseReverseDatabase.backfill runs them a committed batch at a time
+BACKFILLS = [
+    backfill_legacy_items,
+    backfill_history_index,
+]
+
+
+def create_folders_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS folders (id INTEGER PRIMARY KEY, path TEXT UNIQUE)''')
+
+
+def create_file_index_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS file_index (folder TEXT NOT NULL, relpath TEXT NOT NULL, size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL, hash TEXT, fragment TEXT, PRIMARY KEY (folder, relpath))''')
+
+
+def create_watch_files_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS watch_files (inbox TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL, status TEXT NOT NULL, processed_at REAL NOT NULL, PRIMARY KEY (inbox, name))''')
+
+
+# Schema migrations, applied in order; PRAGMA user_version records how many have run.
+# Databases created before versioning already have some of these tables, so every step must be idempotent.
+MIGRATIONS = [
+    create_folders_table,
+    create_parsed_items_tables,
+    create_file_index_table,
+    create_watch_files_table,
+    create_history_tables,
+]
+
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",  # WAL keeps the database consistent; only the last commits can be lost on power failure
+    "PRAGMA cache_size = -16000",  # 16 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+]
+
+
+class ParseReverseDatabase:
+    """
+    Long-lived access to folders.db shared by the GUI and worker threads.
+    Connections come from a small pool and keep their prepared statement cache; writes are serialised
+    through transaction() so background writers never fight over the WAL write lock.
+    """
+
+    def __init__(self, db_path, pool_size=4, busy_timeout=10.0):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.busy_timeout = busy_timeout
+        self.pool = queue.LifoQueue()
+        self.created = 0
+        self.pool_lock = threading.Lock()
+        self.write_lock = threading.RLock()
+        self.migrated = False
+
+    def open_connection(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: transaction() issues BEGIN IMMEDIATE / COMMIT itself
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None,
+                               check_same_thread=False, cached_statements=256)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self.pool_lock:
+            if self.created < self.pool_size:
+                self.created += 1
+                try:
+                    return self.open_connection()
+                except Exception:
+                    self.created -= 1
+                    raise
+        return self.pool.get()
+
+    def release(self, conn):
+        self.pool.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """ Borrow a pooled connection for reads """
+        if not self.migrated:
+            self.migrate()
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """ Borrow a pooled connection inside a single write transaction """
+        if not self.migrated:
+            self.migrate()
+        with self.write_lock:
+            conn = self.acquire()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+            finally:
+                self.release(conn)
+
+    def migrate(self):
+        """ Bring the schema up to date; safe to call repeatedly """
+        with self.write_lock:
+            if self.migrated:
+                return
+            self.migrated = True
+            try:
+                with self.transaction() as conn:
+                    version = conn.execute("PRAGMA user_version").fetchone()[0]
+                    for step in MIGRATIONS[version:]:
+                        step(conn)
+                    if version < len(MIGRATIONS):
+                        conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+            except Exception:
+                self.migrated = False
+                raise
+
+    def backfill(self, is_cancelled=None):
+        """
+        Run the BACKFILLS one batch per transaction until they are done or is_cancelled() returns True, so other
+        writers get the write lock between batches. Returns True when everything is done. Meant for a worker thread.
+        """
+        for step in BACKFILLS:
+            while True:
+                if is_cancelled is not None and is_cancelled():
+                    return False
+                with self.transaction() as conn:
+                    if not step(conn):
+                        break
+        return True
+
+    def close(self):
+        with self.pool_lock:
+            while True:
+                try:
+                    self.pool.get_nowait().close()
+                except queue.Empty:
+                    break
+                self.created -= 1
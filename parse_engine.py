@@ -0,0 +1,406 @@
+import re
+from collections.abc import Mapping
+
+DELIMITER_TYPES = ("Prefix", "Surround")
+
+
+def build_marker_pattern(delimiter, delimiter_type):
+    """ Compile the marker pattern that a stripped line must match to start a new file """
+    if delimiter_type == "Prefix":
+        pattern = f"^{re.escape(delimiter)}\\s*(.+\\..+)$"  # Ensure the filename has an extension
+    else:  # Surround
+        pattern = f"^{re.escape(delimiter)}\\s*(.+\\..+)\\s*{re.escape(delimiter)}$"
+    return re.compile(pattern)
+
+
+# Every byte of the UTF-8 encoding of a whitespace character other than '\n' (U+0085, U+00A0, U+1680, U+2000-U+3000).
+# It lets a few non-space lines through as candidates too, but match_marker rejects those, and a plain class is
+# much faster to scan than the exact encodings
+UTF8_INDENT = rb"[ \t\v\f\r\x1c-\x1f\x80-\xbf\xc2\xe1-\xe3]*"
+
+MARKER_SEPARATOR = " | "
+
+
+def follows_newline(content, position):
+    """ Whether content (str or UTF-8 bytes) has a '\n' just before position """
+    return position > 0 and content[position - 1:position] in ('\n', b'\n')
+
+
+def newline_file(content, sections):
+    """
+    The file parse() gives an extra '\n', or None. The original line loop ended every line with '\n', the last one
+    included, so the last file gets it back unless its marker was on an unterminated last line.
+    """
+    if not sections:
+        return None
+    filename, start, _ = sections[-1]
+    return filename if follows_newline(content, start) else None
+
+
+def parse_marker_spec(spec, default_type="Prefix"):
+    """
+    Turn a delimiter field into [(delimiter, delimiter_type)].
+    Several delimiters are separated by " | " and each may override the type with a suffix,
+    e.g. "### | <!--:Surround"; a plain delimiter such as "//" gives a single marker.
+    """
+    markers = []
+    for entry in spec.split(MARKER_SEPARATOR):
+        entry = entry.strip()
+        delimiter_type = default_type
+        for suffix in DELIMITER_TYPES:
+            if entry.endswith(":" + suffix) and len(entry) > len(suffix) + 1:
+                entry, delimiter_type = entry[:-len(suffix) - 1], suffix
+                break
+        if entry and (entry, delimiter_type) not in markers:
+            markers.append((entry, delimiter_type))
+    return markers
+
+
+def format_marker_spec(markers, default_type="Prefix"):
+    return MARKER_SEPARATOR.join(delimiter if delimiter_type == default_type else f"{delimiter}:{delimiter_type}"
+                                 for delimiter, delimiter_type in markers)
+
+
+class ParseReverseEngine:
+    """
+    Splits a bundle of marker-separated files into {filename: content} without any Qt dependency.
+    delimiter may be a single delimiter, a " | " separated spec (see parse_marker_spec) or a list of
+    (delimiter, delimiter_type) pairs; all of them are found in the same pass.
+    """
+
+    def __init__(self, delimiter, delimiter_type="Prefix"):
+        if not delimiter:
+            raise ValueError("File delimiter is not specified")
+        if delimiter_type not in DELIMITER_TYPES:
+            raise ValueError(f"Unknown delimiter type: {delimiter_type}")
+        markers = parse_marker_spec(delimiter, delimiter_type) if isinstance(delimiter, str) else list(delimiter)
+        if not markers:
+            raise ValueError("File delimiter is not specified")
+        for _, marker_type in markers:
+            if marker_type not in DELIMITER_TYPES:
+                raise ValueError(f"Unknown delimiter type: {marker_type}")
+        self.markers = markers
+        self.delimiter, self.delimiter_type = markers[0]
+        # Longest delimiter first so "###" is tried before "#"; Surround before Prefix for the same delimiter
+        self.marker_patterns = [(marker, build_marker_pattern(marker, marker_type))
+                                for marker, marker_type in sorted(markers, key=lambda m: (-len(m[0]), m[1] != "Surround"))]
+        # Cheap pre-filter: only lines that start with a delimiter (after indentation) can be markers, and one
+        # combined alternation finds them for every delimiter in a single pass
+        alternation = "|".join(re.escape(marker) for marker, _ in self.marker_patterns)
+        self.candidate_pattern = re.compile(f"^[^\\S\\n]*(?:{alternation})", re.MULTILINE)
+        byte_alternation = b"|".join(re.escape(marker.encode('utf-8')) for marker, _ in self.marker_patterns)
+        self.byte_candidate_pattern = re.compile(b"^" + UTF8_INDENT + b"(?:" + byte_alternation + b")", re.MULTILINE)
+
+    def match_marker(self, line):
+        """ Return the filename if the stripped line is a marker for any of the delimiters """
+        for marker, pattern in self.marker_patterns:
+            if line.startswith(marker):
+                match = pattern.match(line)
+                # Surround markers leave the space before the closing delimiter in the group
+                filename = match.group(1).strip() if match else None
+                if filename:
+                    return filename
+        return None
+
+    def scan(self, content):
+        """ Return a list of (filename, start, end) offsets of each file body in content """
+        return self.sections(content, self.candidate_pattern, '\n', str)
+
+    def scan_bytes(self, buffer):
+        """ scan() over UTF-8 bytes (an mmap, say) without decoding them; offsets are byte offsets """
+        return self.sections(buffer, self.byte_candidate_pattern, b'\n',
+                             lambda line: line.decode('utf-8', errors='replace'))
+
+    def sections(self, content, candidate_pattern, newline, decode):
+        """ The scan shared by scan() and scan_bytes(); decode turns a candidate line of content into a str """
+        markers = []
+        for candidate in candidate_pattern.finditer(content):
+            line_start = candidate.start()
+            line_end = content.find(newline, line_start)
+            if line_end == -1:
+                line_end = len(content)
+            filename = self.match_marker(decode(content[line_start:line_end]).strip())
+            if filename:
+                markers.append((filename, line_start, line_end))
+
+        sections = []
+        for index, (filename, line_start, line_end) in enumerate(markers):
+            body_start = min(line_end + 1, len(content))
+            body_end = markers[index + 1][1] if index + 1 < len(markers) else len(content)
+            sections.append((filename, body_start, body_end))
+        return sections
+
+    def spans(self, content):
+        """ Like parse, but returns a ParseReverseSpans that keeps offsets into content instead of copying every body """
+        return ParseReverseSpans(content, self.scan(content))
+
+    def byte_spans(self, buffer):
+        """ spans() for UTF-8 bytes, e.g. an mmap of a bundle that is too large to hold as text """
+        return ParseReverseByteSpans(buffer, self.scan_bytes(buffer))
+
+    def parse(self, content):
+        """ Return {filename: content} with the same semantics as the original line-by-line loop """
+        files = {}
+        sections = self.scan(content)
+        for filename, start, end in sections:
+            # A repeated filename starts over, but keeps its original position
+            files[filename] = content[start:end]
+        last = newline_file(content, sections)
+        if last is not None:
+            files[last] += '\n'
+        return files
+
+
+class ParseReverseStreamParser:
+    """
+    Incremental ParseReverseEngine for text that arrives in chunks. Only the unfinished line and the body of
+    the current file are kept; a file is complete as soon as the next marker line arrives (or on close()).
+    Emitting every (filename, body) in order and letting a later one win gives exactly what parse() returns.
+    """
+
+    def __init__(self, delimiter, delimiter_type="Prefix", on_file=None):
+        self.engine = ParseReverseEngine(delimiter, delimiter_type)
+        self.on_file = on_file
+        self.partial = []  # Text after the last '\n' seen so far
+        self.filename = None
+        self.body = []
+        self.newline = False  # Whether the current file's marker line ended with '\n', see newline_file()
+        self.closed = False
+
+    def feed(self, chunk):
+        """ Add a chunk and return the (filename, body) of the files it completed """
+        if self.closed:
+            raise ValueError("Parser is closed")
+        completed = []
+        end = chunk.rfind('\n')
+        if end == -1:
+            if chunk:
+                self.partial.append(chunk)
+            return completed
+        self.partial.append(chunk[:end + 1])
+        text = ''.join(self.partial)
+        self.partial = [chunk[end + 1:]] if end + 1 < len(chunk) else []
+        self.consume(text, completed)
+        return completed
+
+    def close(self):
+        """ Finish the stream and return the files that were still open """
+        completed = []
+        if self.closed:
+            return completed
+        self.closed = True
+        text = ''.join(self.partial)
+        self.partial = []
+        marker = self.engine.match_marker(text.strip()) if self.engine.candidate_pattern.match(text) else None
+        if marker:
+            self.complete(completed)
+            # A marker on the unterminated last line gets an empty body
+            self.filename, self.body = marker, []
+            self.newline = follows_newline(text, len(text))
+            text = ''
+        if self.filename is not None:
+            self.body.append(text)
+            if self.newline:
+                self.body.append('\n')
+            self.complete(completed)
+        return completed
+
+    def consume(self, text, completed):
+        # text always ends with '\n', so every candidate marker line in it is complete
+        position = 0
+        for candidate in self.engine.candidate_pattern.finditer(text):
+            line_start = candidate.start()
+            line_end = text.find('\n', line_start)
+            filename = self.engine.match_marker(text[line_start:line_end].strip())
+            if not filename:
+                continue
+            if self.filename is not None:
+                self.body.append(text[position:line_start])
+                self.complete(completed)
+            self.filename, self.body = filename, []
+            self.newline = follows_newline(text, line_end + 1)
+            position = line_end + 1
+        if self.filename is not None and position < len(text):
+            self.body.append(text[position:])
+
+    def complete(self, completed):
+        if self.filename is None:
+            return
+        entry = (self.filename, ''.join(self.body))
+        self.filename, self.body = None, []
+        completed.append(entry)
+        if self.on_file is not None:
+            self.on_file(*entry)
+
+
+class ParseReverseSpans(Mapping):
+    """
+    {filename: body} over one source string. Only (start, end) offsets are kept; a body is sliced out when it
+    is read, and stripped() trims the offsets before slicing, so a paste is never held in memory twice.
+    """
+
+    def __init__(self, content, sections):
+        self.content = content
+        self.offsets = {}
+        for filename, start, end in sections:
+            # A repeated filename starts over, but keeps its original position
+            self.offsets[filename] = (start, end)
+        self.newline_file = newline_file(content, sections)
+
+    def __getitem__(self, filename):
+        start, end = self.offsets[filename]
+        body = self.content[start:end]
+        return body + '\n' if filename == self.newline_file else body
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def stripped_span(self, filename):
+        """ The offsets of the body with surrounding whitespace removed, as str.strip() would """
+        start, end = self.offsets[filename]
+        content = self.content
+        while start < end and content[start].isspace():
+            start += 1
+        while end > start and content[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    def stripped(self, filename):
+        start, end = self.stripped_span(filename)
+        return self.content[start:end]
+
+    def is_blank(self, filename):
+        start, end = self.stripped_span(filename)
+        return start == end
+
+
+class ParseReverseByteSpans(ParseReverseSpans):
+    """ ParseReverseSpans over UTF-8 bytes (see ParseReverseEngine.scan_bytes); bodies are decoded as they are read """
+
+    def __getitem__(self, filename):
+        start, end = self.offsets[filename]
+        body = self.content[start:end].decode('utf-8')
+        return body + '\n' if filename == self.newline_file else body
+
+    def stripped(self, filename):
+        return self[filename].strip()
+
+    def is_blank(self, filename):
+        return not self.stripped(filename)
+
+
+def stripped_text(files, filename):
+    """ files[filename].strip(), without the intermediate copy when files is a ParseReverseSpans """
+    if isinstance(files, ParseReverseSpans):
+        return files.stripped(filename)
+    return files[filename].strip()
+
+
+def is_blank(files, filename):
+    if isinstance(files, ParseReverseSpans):
+        return files.is_blank(filename)
+    return not files[filename].strip()
+
+
+class ParseReverseStrippedFiles(Mapping):
+    """ Lazy {filename: stripped body} for some of the files of a parse result; texts are produced as they are read """
+
+    def __init__(self, files, names):
+        self.files = files
+        self.names = dict.fromkeys(names)
+
+    def __getitem__(self, filename):
+        if filename not in self.names:
+            raise KeyError(filename)
+        return stripped_text(self.files, filename)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def subset(self, names):
+        return ParseReverseStrippedFiles(self.files, [filename for filename in names if filename in self.names])
+
+
+# A marker line is a run of punctuation, then a filename with an extension, optionally closed by the same run
+MARKER_CANDIDATE = re.compile(r'([^\w\s]+)\s*(\S.*)$')
+PLAUSIBLE_FILENAME = re.compile(r'[\w.\\/-]+\.\w{1,10}$')
+# Below this many distinct filenames a candidate's confidence is scaled down; two list items are not a bundle
+MIN_DETECTED_FILES = 3
+
+
+def sample_lines(content, max_lines=10000, windows=50):
+    """ Yield up to max_lines lines: the start of the text plus evenly spaced windows through the rest """
+    per_window = max(1, max_lines // windows)
+    length = len(content)
+    position = 0
+    yielded = 0
+    for window in range(windows):
+        if window:
+            # Jump ahead and resynchronise on the first line that starts at or after the target
+            target = length * window // windows
+            if target > position:
+                newline = content.find('\n', target - 1)
+                if newline == -1:
+                    return
+                position = newline + 1
+        for _ in range(per_window):
+            if position >= length:
+                return
+            end = content.find('\n', position)
+            if end == -1:
+                end = length
+            yield content[position:end]
+            yielded += 1
+            position = end + 1
+        if yielded >= max_lines:
+            return
+
+
+def detect_delimiters(content, top_n=5, max_lines=10000):
+    """
+    Rank likely file delimiters from a bounded sample of line starts.
+    Returns [{'delimiter', 'type', 'confidence', 'files'}] best first. confidence is an absolute 0..1 measure for each
+    candidate on its own: how reliably the run is followed by a filename, times the share of the sampled lines from
+    its first marker on, scaled down when it marks fewer than MIN_DETECTED_FILES files.
+    """
+    starts = {}  # delimiter -> sampled lines starting with it
+    hits = {}  # delimiter -> {'Prefix': n, 'Surround': n}
+    names = {}  # delimiter -> distinct filenames
+    first_marker = {}  # delimiter -> index of the first sampled line it marks a file on
+    sampled = 0
+    for index, line in enumerate(sample_lines(content, max_lines)):
+        sampled += 1
+        match = MARKER_CANDIDATE.match(line.strip())
+        if not match:
+            continue
+        delimiter, rest = match.groups()
+        starts[delimiter] = starts.get(delimiter, 0) + 1
+        delimiter_type = "Prefix"
+        if rest.endswith(delimiter) and len(rest) > len(delimiter):
+            rest = rest[:-len(delimiter)].rstrip()
+            delimiter_type = "Surround"
+        if PLAUSIBLE_FILENAME.match(rest):
+            counts = hits.setdefault(delimiter, {"Prefix": 0, "Surround": 0})
+            counts[delimiter_type] += 1
+            names.setdefault(delimiter, set()).add(rest)
+            first_marker.setdefault(delimiter, index)
+
+    scored = []
+    for delimiter, counts in hits.items():
+        files = len(names[delimiter])
+        precision = (counts["Prefix"] + counts["Surround"]) / starts[delimiter]
+        # Prose before the first marker is not part of the bundle
+        coverage = (sampled - first_marker[delimiter]) / sampled
+        confidence = precision * coverage * min(1.0, files / MIN_DETECTED_FILES)
+        delimiter_type = "Surround" if counts["Surround"] > counts["Prefix"] else "Prefix"
+        scored.append((confidence, files, delimiter, delimiter_type))
+
+    scored.sort(key=lambda item: item[:2], reverse=True)
+    return [{'delimiter': delimiter, 'type': delimiter_type, 'confidence': confidence, 'files': files}
+            for confidence, files, delimiter, delimiter_type in scored[:top_n]]
@@ -0,0 +1,168 @@
+"""
+Search and restore the files of past parse runs recorded in folders.db.
+
+    python parse_history.py --db folders.db search "def main" --file .py --limit 20
+    python parse_history.py --db folders.db restore 42 -o restored/ app/main.py
+
+Content search goes through the parsed_items_fts index, and pages are fetched by (run_id, filename) keyset
+instead of OFFSET, so the hundredth page of a query costs about as much as the first.
+"""
+import sys
+import json
+import argparse
+import sqlite3
+from collections.abc import Mapping
+
+from parse_db import ParseReverseDatabase, has_history_index, history_index_ready, load_parsed_item
+from parse_writer import ParseReverseWriter, WRITTEN, SKIPPED, FAILED, CANCELLED
+
+HISTORY_PAGE_SIZE = 100
+HISTORY_COLUMNS = ('run_id', 'folder', 'filename', 'created_at', 'hash', 'size')
+# Above this many matching rows a content search walks the history in order instead of sorting every match
+SORT_MATCHES_LIMIT = 5000
+MATCHING_HASHES = '''SELECT hash FROM parsed_items WHERE rowid IN (SELECT rowid FROM parsed_items_fts WHERE parsed_items_fts MATCH ?)'''
+
+
+def fts_query(text):
+    """ Turn what a user typed into an FTS5 query: every word must occur, and a trailing * searches by prefix """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith('*') and len(word) > 1
+        word = word.rstrip('*') if prefix else word
+        terms.append('"' + word.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+def search_history(conn, query=None, folder=None, filename=None, after=None, limit=HISTORY_PAGE_SIZE):
+    """
+    One page of parse_history rows as dicts, newest run first. query is matched against file contents, filename
+    is a substring of the file name. Pass the (run_id, filename) of the last row as after to get the next page.
+    """
+    conditions = []
+    params = []
+    try:
+        if query:
+            if not has_history_index(conn):
+                raise ValueError("Full-text search is not available in this SQLite build")
+            if not history_index_ready(conn):
+                raise ValueError("The history index is still being built")
+            match = fts_query(query)
+            matches = conn.execute(f'''SELECT count(*) FROM (SELECT 1 FROM parse_run_files WHERE hash IN ({MATCHING_HASHES}) LIMIT ?)''',
+                                   (match, SORT_MATCHES_LIMIT + 1)).fetchone()[0]
+            # A rare term is fastest looked up by hash and sorted; for a common one the unary + keeps SQLite from
+            # using the hash index, so it reads newest first and stops after one page
+            column = "hash" if matches <= SORT_MATCHES_LIMIT else "+hash"
+            conditions.append(f'''{column} IN ({MATCHING_HASHES})''')
+            params.append(match)
+    except sqlite3.OperationalError as e:
+        raise ValueError(f"Invalid search: {str(e)}")
+    if folder:
+        # By run id rather than folder = ?, so the rows still come out in order without a sort
+        conditions.append('''run_id IN (SELECT id FROM parse_runs WHERE folder = ?)''')
+        params.append(folder)
+    if filename:
+        conditions.append('''instr(filename, ?) > 0''')
+        params.append(filename)
+    if after is not None:
+        conditions.append('''(run_id, filename) < (?, ?)''')
+        params.extend(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit)
+    try:
+        rows = conn.execute(f'''SELECT {', '.join(HISTORY_COLUMNS)} FROM parse_history {where}
+                                ORDER BY run_id DESC, filename DESC LIMIT ?''', params).fetchall()
+    except sqlite3.OperationalError as e:
+        raise ValueError(f"Invalid search: {str(e)}")
+    return [dict(zip(HISTORY_COLUMNS, row)) for row in rows]
+
+
+def run_entries(conn, run_id):
+    """ [(filename, hash)] of every file recorded for one run """
+    return conn.execute('''SELECT filename, hash FROM parse_run_files WHERE run_id = ? ORDER BY filename''', (run_id,)).fetchall()
+
+
+class ParseReverseHistoryFiles(Mapping):
+    """ Lazy {filename: content} of past versions; each body is read and decompressed from the database when it is written """
+
+    def __init__(self, db, entries):
+        self.db = db
+        self.hashes = dict(entries)
+
+    def __getitem__(self, filename):
+        with self.db.connection() as conn:
+            content = load_parsed_item(conn, self.hashes[filename])
+        if content is None:
+            raise KeyError(filename)
+        return content
+
+    def __iter__(self):
+        return iter(self.hashes)
+
+    def __len__(self):
+        return len(self.hashes)
+
+
+def restore_files(db, entries, path, progress=None, is_cancelled=None):
+    """ Write the past versions [(filename, hash)] under path, skipping files that already have that content """
+    summary = ParseReverseWriter(path).write_files(ParseReverseHistoryFiles(db, entries), progress=progress,
+                                                   is_cancelled=is_cancelled)
+    return {
+        'path': path,
+        'selected': len(entries),
+        'written': len(summary[WRITTEN]),
+        'skipped': len(summary[SKIPPED]),
+        'failed': summary[FAILED],
+        'cancelled': bool(summary[CANCELLED])
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search and restore files from past Reverse Parse runs")
+    parser.add_argument("--db", required=True, help="the folders.db the runs were recorded in")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="list recorded files, newest first, as JSON lines")
+    search.add_argument("query", nargs='?', help="words the file content must contain (word* for a prefix)")
+    search.add_argument("--folder", help="only runs into this folder")
+    search.add_argument("--file", dest="filename", help="only file names containing this")
+    search.add_argument("--limit", type=int, default=HISTORY_PAGE_SIZE)
+    restore = commands.add_parser("restore", help="write the files of a past run (default: all of them)")
+    restore.add_argument("run_id", type=int)
+    restore.add_argument("files", nargs='*')
+    restore.add_argument("-o", "--output", help="folder to write to (default: the run's own folder)")
+    args = parser.parse_args(argv)
+
+    db = ParseReverseDatabase(args.db)
+    try:
+        if args.command == "search" and args.query:
+            db.backfill()  # Finish indexing older runs first; the GUI does this in the background instead
+        with db.connection() as conn:
+            if args.command == "search":
+                try:
+                    rows = search_history(conn, args.query, args.folder, args.filename, limit=args.limit)
+                except ValueError as e:
+                    parser.error(str(e))
+                for row in rows:
+                    print(json.dumps(row))
+                return 0
+            run = conn.execute('''SELECT folder FROM parse_runs WHERE id = ?''', (args.run_id,)).fetchone()
+            entries = run_entries(conn, args.run_id)
+        if run is None:
+            parser.error(f"No run with id {args.run_id}")
+        if args.files:
+            recorded = dict(entries)
+            missing = [filename for filename in args.files if filename not in recorded]
+            if missing:
+                parser.error(f"Not in run {args.run_id}: {', '.join(missing)}")
+            entries = [(filename, recorded[filename]) for filename in args.files]
+        output = args.output or run[0]
+        if not output:
+            parser.error("The run has no folder recorded, pass --output")
+        result = restore_files(db, entries, output)
+        print(json.dumps(result))
+        return 1 if result['failed'] else 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
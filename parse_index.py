@@ -0,0 +1,179 @@
+"""
+Indexed bundles: a plain marker bundle preceded by a table of each file's byte offset, length and hash.
+
+    PARSE-REVERSE-INDEX 1 <index bytes>\n
+    {"delimiter": ..., "type": ..., "files": [{"name", "offset", "length", "newline", "sha256"}, ...]}\n
+    ### first/file.py
+    ...
+
+The header sits before the first marker, which the parser ignores, so an indexed bundle still parses as
+plain text. Offsets are relative to the first byte after the header, and a file body is read straight out
+of an mmap of the bundle without scanning the rest of it.
+
+    python parse_index.py build bundle.txt bundle.prb --delimiter "###"
+    python parse_index.py list bundle.prb
+    python parse_index.py extract bundle.prb out/ app/main.py app/util.py
+"""
+import os
+import sys
+import json
+import mmap
+import hashlib
+import tempfile
+import argparse
+from collections.abc import Mapping
+
+from parse_engine import ParseReverseEngine, DELIMITER_TYPES, format_marker_spec, newline_file
+from parse_writer import reverse_parse_to_disk
+
+INDEX_MAGIC = b"PARSE-REVERSE-INDEX"
+INDEX_VERSION = 1
+INDEXED_EXTENSION = ".prb"
+
+
+def index_sections(content, delimiter, delimiter_type="Prefix"):
+    """ Return the index entries of content's files, with offsets and lengths in UTF-8 bytes """
+    engine = ParseReverseEngine(delimiter, delimiter_type)
+    sections = engine.scan(content)
+    entries = {}
+    ascii_only = content.isascii()
+    last = newline_file(content, sections)
+    char_pos = byte_pos = 0
+    for index, (filename, start, end) in enumerate(sections):
+        # Sections are in order, so byte offsets can be advanced instead of re-encoding from the start
+        if not ascii_only:
+            byte_pos += len(content[char_pos:start].encode('utf-8'))
+            char_pos = start
+            byte_start = byte_pos
+            byte_pos += len(content[char_pos:end].encode('utf-8'))
+            char_pos = end
+            byte_end = byte_pos
+        else:
+            byte_start, byte_end = start, end
+        newline = index == len(sections) - 1 and filename == last
+        body = content[start:end] + ('\n' if newline else '')
+        # A repeated filename replaces the earlier body but keeps its position, as in parse()
+        entries[filename] = {'name': filename, 'offset': byte_start, 'length': byte_end - byte_start, 'newline': newline,
+                             'sha256': hashlib.sha256(body.encode('utf-8')).hexdigest()}
+    return list(entries.values())
+
+
+def write_indexed_bundle(path, content, delimiter, delimiter_type="Prefix"):
+    """ Write content as an indexed bundle at path (atomically) and return the number of files indexed """
+    files = index_sections(content, delimiter, delimiter_type)
+    markers = ParseReverseEngine(delimiter, delimiter_type).markers
+    index = json.dumps({'delimiter': format_marker_spec(markers, delimiter_type), 'type': delimiter_type, 'files': files},
+                       separators=(',', ':')).encode('utf-8') + b'\n'
+    header = INDEX_MAGIC + f" {INDEX_VERSION} {len(index)}\n".encode('ascii')
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(index)
+            f.write(content.encode('utf-8'))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return len(files)
+
+
+def is_indexed_bundle(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(INDEX_MAGIC)) == INDEX_MAGIC
+    except OSError:
+        return False
+
+
+class ParseReverseIndexedBundle(Mapping):
+    """
+    Read-only {filename: body} view of an indexed bundle. Bodies are decoded from an mmap on access, so a
+    caller that only needs a few files never touches the rest; it can be passed anywhere a parse result is.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            magic, version, length = self.file.readline().split()
+            if magic != INDEX_MAGIC or int(version) != INDEX_VERSION:
+                raise ValueError(f"Not an indexed bundle: {path}")
+            index = json.loads(self.file.read(int(length)))
+            self.body_start = self.file.tell()
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+        self.delimiter = index['delimiter']
+        self.delimiter_type = index['type']
+        self.entries = {entry['name']: entry for entry in index['files']}
+
+    def __getitem__(self, filename):
+        entry = self.entries[filename]
+        start = self.body_start + entry['offset']
+        body = self.map[start:start + entry['length']].decode('utf-8')
+        return body + '\n' if entry['newline'] else body
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def verify(self, filename):
+        return hashlib.sha256(self[filename].encode('utf-8')).hexdigest() == self.entries[filename]['sha256']
+
+    def text(self):
+        """ The plain marker text without the index header """
+        return self.map[self.body_start:].decode('utf-8')
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, list and extract indexed Reverse Parse bundles")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="index a plain bundle")
+    build.add_argument("bundle")
+    build.add_argument("output")
+    build.add_argument("-d", "--delimiter", required=True)
+    build.add_argument("-t", "--type", dest="delimiter_type", choices=DELIMITER_TYPES, default="Prefix")
+    listing = commands.add_parser("list", help="print the index as JSON")
+    listing.add_argument("bundle")
+    extract = commands.add_parser("extract", help="write some (default: all) files of an indexed bundle")
+    extract.add_argument("bundle")
+    extract.add_argument("folder")
+    extract.add_argument("files", nargs='*')
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        with open(args.bundle, encoding='utf-8') as f:
+            count = write_indexed_bundle(args.output, f.read(), args.delimiter, args.delimiter_type)
+        print(json.dumps({'output': args.output, 'files': count}))
+        return 0
+
+    with ParseReverseIndexedBundle(args.bundle) as bundle:
+        if args.command == "list":
+            print(json.dumps(list(bundle.entries.values()), indent=2))
+            return 0
+        missing = [filename for filename in args.files if filename not in bundle]
+        if missing:
+            parser.error(f"Not in the bundle: {', '.join(missing)}")
+        result = reverse_parse_to_disk("", args.folder, bundle.delimiter, bundle.delimiter_type,
+                                       selected_files=args.files or None, files=bundle)
+        print(json.dumps({'written': result['written'], 'skipped': result['skipped'], 'failed': result['failed']}))
+        return 1 if result['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
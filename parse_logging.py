@@ -0,0 +1,54 @@
+import os
+import queue
+import logging
+import logging.handlers
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
+# Environment overrides, so the level and file sink can be changed without a settings dialog
+LOG_LEVEL_ENV = "PARSE_REVERSE_LOG_LEVEL"
+LOG_LINES_ENV = "PARSE_REVERSE_LOG_LINES"
+LOG_FILE_ENV = "PARSE_REVERSE_LOG_FILE"
+
+DEFAULT_LOG_LEVEL = "INFO"
+DEFAULT_LOG_LINES = 5000
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+
+def configured_level():
+    level = os.environ.get(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL).upper()
+    return level if level in LOG_LEVELS else DEFAULT_LOG_LEVEL
+
+
+def configured_max_lines():
+    try:
+        return max(100, int(os.environ.get(LOG_LINES_ENV, DEFAULT_LOG_LINES)))
+    except ValueError:
+        return DEFAULT_LOG_LINES
+
+
+def start_file_sink(path=None, level=None):
+    """
+    Attach an optional rotating log file to the root logger.
+    Records are handed to a QueueHandler and written by a QueueListener thread, so callers never wait on disk.
+    Returns the listener (stop() it on exit) or None when no file is configured.
+    """
+    path = path or os.environ.get(LOG_FILE_ENV)
+    if not path:
+        return None
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS,
+                                                        encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    records = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(records)
+    if level is not None:
+        queue_handler.setLevel(level)
+    logging.getLogger().addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import time
+import logging
+import cProfile
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Set to a directory (or "1" for the current directory) to write a cProfile .prof file per operation
+PROFILE_ENV = "PARSE_REVERSE_PROFILE"
+MAX_RECENT_RUNS = 100
+
+_recent_runs = deque(maxlen=MAX_RECENT_RUNS)
+_recent_lock = threading.Lock()
+# Python 3.12+ allows one active profiler per interpreter, so only one operation is profiled at a time
+_profile_lock = threading.Lock()
+
+
+class ParseReverseMetrics:
+    """ Stage timers and counters for one operation (a parse, a bundle, ...) """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.started_at = time.time()
+        self.stages = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self):
+        return {
+            'operation': self.operation,
+            'started_at': self.started_at,
+            'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            'counters': dict(self.counters)
+        }
+
+
+def process_age():
+    """ Seconds since this process was created, from the OS, or None where it cannot be read """
+    try:
+        if sys.platform.startswith('linux'):
+            with open('/proc/self/stat') as f:
+                # starttime is field 22, in clock ticks since boot; the command name before it may contain spaces
+                start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+            with open('/proc/uptime') as f:
+                uptime = float(f.read().split()[0])
+            return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+            kernel32 = ctypes.windll.kernel32
+            creation, exited, kernel, user, now = (wintypes.FILETIME() for _ in range(5))
+            if not kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), ctypes.byref(creation), ctypes.byref(exited),
+                                            ctypes.byref(kernel), ctypes.byref(user)):
+                return None
+            kernel32.GetSystemTimeAsFileTime(ctypes.byref(now))
+            # FILETIMEs count 100 ns intervals in two 32-bit halves
+            ticks = [filetime.dwHighDateTime << 32 | filetime.dwLowDateTime for filetime in (now, creation)]
+            return max(0.0, (ticks[0] - ticks[1]) / 1e7)
+    except (OSError, ValueError, IndexError, AttributeError, ImportError):
+        return None
+    return None
+
+
+def format_metrics(metrics):
+    """ One-line readout of a metrics dict for a status bar """
+    stages = " · ".join(f"{name} {ms:,.0f} ms" for name, ms in metrics['stages_ms'].items())
+    counters = " · ".join(f"{value:,} {name}" for name, value in metrics['counters'].items())
+    return f"{metrics['operation']}: {stages}" + (f" | {counters}" if counters else "")
+
+
+def record_run(metrics):
+    with _recent_lock:
+        _recent_runs.append(metrics.as_dict() if isinstance(metrics, ParseReverseMetrics) else metrics)
+
+
+def recent_runs():
+    with _recent_lock:
+        return list(_recent_runs)
+
+
+def export_runs(path):
+    """ Write the recent runs as JSON and return how many were written """
+    runs = recent_runs()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+    return len(runs)
+
+
+@contextmanager
+def profiled(operation):
+    """ Profile the block with cProfile when PARSE_REVERSE_PROFILE is set; otherwise a no-op """
+    target = os.environ.get(PROFILE_ENV)
+    if not target:
+        yield
+        return
+    directory = os.getcwd() if target == "1" else target
+    if not _profile_lock.acquire(blocking=False):
+        logging.warning(f"Not profiling {operation}: another operation is being profiled")
+        yield
+        return
+    try:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # Another profiling tool (a debugger, coverage) is active
+            logging.warning(f"Not profiling {operation}: {str(e)}")
+            profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                os.makedirs(directory, exist_ok=True)
+                profile.dump_stats(os.path.join(directory, f"{operation}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}.prof"))
+    finally:
+        _profile_lock.release()
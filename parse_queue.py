@@ -0,0 +1,70 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class ParseReverseCoalescingQueue:
+    """
+    Bounded, debounced job queue keyed by target folder.
+    A newer job for a key replaces the pending one, and a job is only handed out once no newer job
+    for its key has arrived for `debounce` seconds, so a burst of copies collapses into one parse.
+    """
+
+    def __init__(self, max_pending=16, debounce=0.3):
+        self.max_pending = max_pending
+        self.debounce = debounce
+        self.pending = OrderedDict()  # key -> (job, ready_at)
+        self.condition = threading.Condition()
+        self.closed = False
+        self.enqueued = 0
+        self.dropped = 0
+        self.processed = 0
+
+    def put(self, key, job):
+        """ Queue job for key and return the number of jobs it superseded or pushed out """
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Queue is closed")
+            dropped = 0
+            if key in self.pending:
+                del self.pending[key]
+                dropped += 1
+            elif len(self.pending) >= self.max_pending:
+                self.pending.popitem(last=False)
+                dropped += 1
+            self.pending[key] = (job, time.monotonic() + self.debounce)
+            self.enqueued += 1
+            self.dropped += dropped
+            self.condition.notify_all()
+            return dropped
+
+    def get(self):
+        """ Block until a job is ready and return (key, job), or None once the queue is closed """
+        with self.condition:
+            while True:
+                if self.closed:
+                    return None
+                now = time.monotonic()
+                wait = None
+                for key, (job, ready_at) in self.pending.items():
+                    if ready_at <= now:
+                        del self.pending[key]
+                        return key, job
+                    wait = ready_at - now if wait is None else min(wait, ready_at - now)
+                self.condition.wait(wait)
+
+    def task_done(self):
+        with self.condition:
+            self.processed += 1
+
+    def close(self):
+        """ Stop handing out jobs; anything still pending is discarded """
+        with self.condition:
+            self.closed = True
+            self.dropped += len(self.pending)
+            self.pending.clear()
+            self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            return {'depth': len(self.pending), 'enqueued': self.enqueued, 'dropped': self.dropped, 'processed': self.processed}
@@ -0,0 +1,111 @@
+"""
+Keep very large pastes out of memory: the text is written to a temp file once and parsed from an mmap of it.
+
+The budget is read from PARSE_REVERSE_MEMORY_BUDGET_MB (default 64). Text larger than that is spilled; the
+editor then shows preview() and the parse result is a ParseReverseByteSpans that decodes a body only when it
+is read, so only the file being written is ever held as a str.
+"""
+import os
+import mmap
+import logging
+import tempfile
+import weakref
+
+from parse_engine import ParseReverseEngine
+
+MEMORY_BUDGET_ENV = "PARSE_REVERSE_MEMORY_BUDGET_MB"
+DEFAULT_MEMORY_BUDGET_MB = 64
+PREVIEW_CHARS = 64 * 1024
+SPILL_CHUNK_CHARS = 1024 * 1024
+
+
+def configured_memory_budget():
+    """ The spill threshold in characters; 0 turns spilling off """
+    value = os.environ.get(MEMORY_BUDGET_ENV)
+    try:
+        megabytes = float(value) if value else DEFAULT_MEMORY_BUDGET_MB
+    except ValueError:
+        logging.warning(f"Ignoring {MEMORY_BUDGET_ENV}={value!r}, expected a number of megabytes")
+        megabytes = DEFAULT_MEMORY_BUDGET_MB
+    return max(0, int(megabytes * 1024 * 1024))
+
+
+def exceeds_budget(text, budget=None):
+    budget = configured_memory_budget() if budget is None else budget
+    return budget > 0 and len(text) > budget
+
+
+def remove_spill(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ParseReverseSpill:
+    """
+    A paste spilled to a temp file and mapped read-only. close() unmaps and removes the file; if a spill is never
+    closed, the file is removed once the mmap is garbage.
+    """
+
+    def __init__(self, path, chars, lines):
+        self.path = path
+        self.chars = chars
+        self.lines = lines
+        self.cache = {}
+        with open(path, 'rb') as f:
+            self.size = os.fstat(f.fileno()).st_size
+            # mmap refuses empty files, and an empty spill has nothing to parse anyway
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        if self.size:
+            weakref.finalize(self.map, remove_spill, path)
+        else:
+            remove_spill(path)
+
+    @classmethod
+    def from_text(cls, text, directory=None, is_cancelled=None):
+        """ Write text as UTF-8 in chunks, so the encoded copy never exists in full; None if is_cancelled() stops it """
+        fd, path = tempfile.mkstemp(prefix="parse_reverse_", suffix=".spill", dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for start in range(0, len(text), SPILL_CHUNK_CHARS):
+                    if is_cancelled is not None and is_cancelled():
+                        break
+                    f.write(text[start:start + SPILL_CHUNK_CHARS].encode('utf-8', errors='replace'))
+                else:
+                    return cls(path, len(text), text.count('\n') + 1 if text else 0)
+            os.remove(path)
+            return None
+        except BaseException:
+            os.remove(path)
+            raise
+
+    def preview(self, limit=PREVIEW_CHARS):
+        """ The first limit characters or so; a character cut in half at the end is dropped """
+        return self.map[:limit * 4].decode('utf-8', errors='ignore')[:limit]
+
+    def files(self, delimiter, delimiter_type="Prefix"):
+        """ {filename: body} for these markers, scanned from the mmap once per delimiter """
+        key = (delimiter, delimiter_type)
+        if key not in self.cache:
+            self.cache[key] = ParseReverseEngine(delimiter, delimiter_type).byte_spans(self.map)
+        return self.cache[key]
+
+    def scanned(self, delimiter, delimiter_type="Prefix"):
+        """ files() if it has been scanned for these markers already, else None; never scans """
+        return self.cache.get((delimiter, delimiter_type))
+
+    def text(self):
+        """ The whole paste as a str, for callers that really need it (e.g. saving it elsewhere) """
+        return self.map[:].decode('utf-8')
+
+    def stats(self):
+        return f"{self.chars:,} characters, {self.lines:,} lines, {self.size / (1024 * 1024):.1f} MB spilled to disk"
+
+    def close(self):
+        """ Unmap and remove the temp file; files() read from it can no longer be read, so wait for their readers """
+        self.cache.clear()
+        if self.size and not self.map.closed:
+            self.map.close()
+        self.map = b''
+        remove_spill(self.path)
@@ -0,0 +1,172 @@
+"""
+Reverse parse a bundle while it is still arriving, writing each file as soon as the next marker shows up.
+
+    some-generator | python parse_stream.py -o out/ --delimiter "###"
+    python parse_stream.py -o out/ --delimiter "###" --listen 8765
+    python parse_stream.py -o out/ --delimiter "###" --unix /tmp/parse_reverse.sock
+
+With --listen or --unix every connection is one bundle; when the client shuts down its sending side, the
+JSON summary of that bundle is sent back. Only the file currently being received is held in memory.
+
+Line endings are normalised as they are decoded: \\r\\n and a lone \\r both become \\n, exactly as parse_cli and
+parse_watch get them from reading the bundle file in text mode, so a streamed bundle writes the same files.
+"""
+import io
+import os
+import sys
+import json
+import codecs
+import socket
+import logging
+import argparse
+
+from parse_engine import ParseReverseStreamParser, DELIMITER_TYPES
+from parse_writer import ParseReverseWriter, WRITTEN, SKIPPED, FAILED
+from parse_db import ParseReverseDatabase, create_parse_run, add_parse_run_files
+from parse_metrics import ParseReverseMetrics, record_run
+from parse_logging import LOG_FORMAT
+
+CHUNK_SIZE = 64 * 1024
+
+
+def decode_chunks(read, size=CHUNK_SIZE, encoding='utf-8'):
+    """
+    Yield text from read(size) until it returns nothing, decoding across chunk boundaries. \\r\\n and lone \\r
+    become \\n, as with open() in text mode, even when a \\r\\n pair is split between two chunks.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors='replace'), translate=True)
+    while True:
+        data = read(size)
+        if not data:
+            break
+        text = decoder.decode(data)
+        if text:
+            yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def stream_to_disk(chunks, path, delimiter, delimiter_type="Prefix", db=None, on_file=None, is_cancelled=None):
+    """
+    Parse text chunks as they come and write every completed, non-empty file under path right away.
+    on_file(status, filename, error) is called after each write. Returns a result dict like reverse_parse_to_disk.
+    """
+    writer = ParseReverseWriter(path)
+    summary = {WRITTEN: [], SKIPPED: [], FAILED: []}
+    metrics = ParseReverseMetrics("stream")
+    run_id = None
+
+    def write(filename, body):
+        nonlocal run_id
+        text = body.strip()
+        if not text:
+            return
+        with metrics.stage("write"):
+            status, _, error = writer.write_file(filename, text)
+        summary[status].append((filename, error) if status == FAILED else filename)
+        metrics.count("bytes", len(text))
+        if db is not None and status != FAILED:
+            with metrics.stage("db"):
+                with db.transaction() as conn:
+                    if run_id is None:
+                        run_id = create_parse_run(conn, path)
+                    add_parse_run_files(conn, run_id, {filename: text})
+        if on_file is not None:
+            on_file(status, filename, error)
+
+    parser = ParseReverseStreamParser(delimiter, delimiter_type, on_file=write)
+    cancelled = False
+    try:
+        for chunk in chunks:
+            if is_cancelled is not None and is_cancelled():
+                cancelled = True
+                break
+            with metrics.stage("scan"):
+                parser.feed(chunk)
+        if not cancelled:
+            parser.close()
+    finally:
+        metrics.count("files", len(summary[WRITTEN]))
+        metrics.count("skipped", len(summary[SKIPPED]))
+        metrics.count("errors", len(summary[FAILED]))
+        record_run(metrics)
+
+    return {
+        'path': path,
+        'delimiter': delimiter,
+        'delimiter_type': delimiter_type,
+        'written': len(summary[WRITTEN]),
+        'skipped': len(summary[SKIPPED]),
+        'failed': summary[FAILED],
+        'cancelled': cancelled,
+        'metrics': metrics.as_dict()
+    }
+
+
+def log_file(status, filename, error):
+    if status == FAILED:
+        logging.error(f"Write Error: {filename}: {error}")
+    else:
+        logging.info(f"{filename} {status}")
+
+
+def serve(server, path, delimiter, delimiter_type, db, encoding='utf-8'):
+    """ Parse one bundle per connection until interrupted, replying with its JSON summary """
+    while True:
+        conn, address = server.accept()
+        with conn:
+            logging.info(f"Receiving a bundle from {address or 'local socket'}")
+            try:
+                result = stream_to_disk(decode_chunks(conn.recv, encoding=encoding), path, delimiter, delimiter_type, db, log_file)
+            except Exception as e:
+                logging.error(f"Stream Error: {str(e)}")
+                result = {'path': path, 'error': str(e)}
+            try:
+                conn.sendall(json.dumps(result).encode('utf-8') + b'\n')
+            except OSError:
+                pass  # The client did not wait for the summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reverse parse a bundle from stdin or a local socket as it arrives")
+    parser.add_argument("-o", "--output", required=True, help="folder the parsed files are written to")
+    parser.add_argument("-d", "--delimiter", required=True, help="file delimiter; several as '### | <!--:Surround'")
+    parser.add_argument("-t", "--type", dest="delimiter_type", choices=DELIMITER_TYPES, default="Prefix")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--listen", metavar="[HOST:]PORT", help="accept bundles over TCP (default host 127.0.0.1)")
+    if hasattr(socket, 'AF_UNIX'):
+        source.add_argument("--unix", metavar="PATH", help="accept bundles on a Unix domain socket")
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--db", help="record the runs in this folders.db")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, stream=sys.stderr)
+    db = ParseReverseDatabase(args.db) if args.db else None
+    try:
+        if args.listen:
+            host, _, port = args.listen.rpartition(':')
+            with socket.create_server((host or '127.0.0.1', int(port))) as server:
+                serve(server, args.output, args.delimiter, args.delimiter_type, db, args.encoding)
+        elif getattr(args, 'unix', None):
+            if os.path.exists(args.unix):
+                os.remove(args.unix)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+                server.bind(args.unix)
+                server.listen()
+                serve(server, args.output, args.delimiter, args.delimiter_type, db, args.encoding)
+        else:
+            chunks = decode_chunks(sys.stdin.buffer.read1, encoding=args.encoding)
+            result = stream_to_disk(chunks, args.output, args.delimiter, args.delimiter_type, db, log_file)
+            print(json.dumps(result))
+            return 1 if result['failed'] else 0
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if db is not None:
+            db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
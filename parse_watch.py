@@ -0,0 +1,247 @@
+"""
+Watch an inbox folder and reverse parse every bundle file dropped into it.
+
+    python parse_watch.py inbox/ -o out/ --delimiter "###"
+
+On Linux the inbox is watched with inotify, so a bundle is picked up as soon as it is closed or moved in;
+elsewhere the folder is polled with scandir and a file is taken once its size and mtime stop changing.
+Processed files are recorded in the database by name, size and mtime, so a restart only parses new or
+changed bundles.
+"""
+import os
+import sys
+import time
+import json
+import select
+import struct
+import fnmatch
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from parse_engine import DELIMITER_TYPES
+from parse_writer import reverse_parse_to_disk
+from parse_db import ParseReverseDatabase
+from parse_logging import LOG_FORMAT
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:  # pragma: no cover - ctypes is missing on some embedded builds
+    ctypes = None
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct('iIII')
+
+PROCESSED = "processed"
+FAILED = "failed"
+
+
+class ParseReverseInotify:
+    """ Minimal inotify watch on one directory through libc; open() returns None where it is not available """
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    @classmethod
+    def open(cls, path):
+        if ctypes is None or not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return None
+            if libc.inotify_add_watch(fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+                os.close(fd)
+                return None
+            return cls(fd)
+        except (OSError, AttributeError):
+            return None
+
+    def wait(self, timeout):
+        """ Wait up to timeout seconds and return the names of files that were closed after writing or moved in """
+        names = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return names
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ParseReverseFolderWatcher:
+    """ Parses bundle files that appear in inbox into output on a thread pool, once per name/size/mtime """
+
+    def __init__(self, inbox, output, delimiter, delimiter_type="Prefix", db=None, patterns=None,
+                 max_workers=2, poll_interval=1.0, auto_detect=False):
+        if not os.path.isdir(inbox):
+            raise ValueError(f"Inbox folder does not exist: {inbox}")
+        if not delimiter:
+            raise ValueError("File delimiter is not specified")
+        self.inbox = inbox
+        self.folder = os.path.normcase(os.path.abspath(inbox))
+        self.output = output
+        self.delimiter = delimiter
+        self.delimiter_type = delimiter_type
+        self.db = db
+        self.patterns = list(patterns or ["*"])
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        # Nobody reviews what an unattended parse writes, so falling back to a detected delimiter is opt-in
+        self.auto_detect = auto_detect
+        self.processed = {}  # name -> (size, mtime_ns), also kept in watch_files when there is a db
+        self.seen = {}  # name -> (size, mtime_ns) from the previous scan, to tell when a polled file has settled
+
+    def load_processed(self):
+        if self.db is None:
+            return
+        with self.db.connection() as conn:
+            rows = conn.execute('''SELECT name, size, mtime_ns FROM watch_files WHERE inbox = ?''', (self.folder,)).fetchall()
+        self.processed = {name: (size, mtime_ns) for name, size, mtime_ns in rows}
+
+    def mark(self, name, stamp, status):
+        self.processed[name] = stamp
+        if self.db is None:
+            return
+        with self.db.transaction() as conn:
+            conn.execute('''INSERT OR REPLACE INTO watch_files (inbox, name, size, mtime_ns, status, processed_at)
+                            VALUES (?, ?, ?, ?, ?, ?)''', (self.folder, name, stamp[0], stamp[1], status, time.time()))
+
+    def scan(self):
+        """ Return {name: (size, mtime_ns)} of the bundle files currently in the inbox """
+        files = {}
+        with os.scandir(self.inbox) as entries:
+            for entry in entries:
+                # Hidden and partial files are still being written by whoever drops them here
+                if entry.name.startswith('.') or entry.name.endswith(('.part', '.tmp')):
+                    continue
+                if not any(fnmatch.fnmatch(entry.name, pattern) for pattern in self.patterns):
+                    continue
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+        return files
+
+    def ready(self, closed=()):
+        """ Files that are new or changed since they were processed and are no longer being written """
+        files = self.scan()
+        settled_before = time.time_ns() - int(self.poll_interval * 1e9)
+        ready = {}
+        for name, stamp in files.items():
+            if self.processed.get(name) == stamp:
+                continue
+            if name in closed or (self.seen.get(name) == stamp and stamp[1] <= settled_before):
+                ready[name] = stamp
+        self.seen = files
+        return ready
+
+    def parse_file(self, name, is_cancelled=None):
+        with open(os.path.join(self.inbox, name), encoding='utf-8') as f:
+            content = f.read()
+        result = reverse_parse_to_disk(content, self.output, self.delimiter, self.delimiter_type, db=self.db,
+                                       is_cancelled=is_cancelled, auto_detect=self.auto_detect)
+        result['bundle'] = name
+        return result
+
+    def run(self, on_finished=None, on_failed=None, is_cancelled=None):
+        """
+        Watch until is_cancelled() returns True. on_finished(result) and on_failed(name, message) are
+        called from this thread as bundles complete. Cancelling also stops the parses in flight at their next
+        file; those bundles are not recorded as processed, so they are parsed again on the next run.
+        """
+        self.load_processed()
+        inotify = ParseReverseInotify.open(self.inbox)
+        logging.info(f"Watching {self.inbox} with {'inotify' if inotify else 'polling'}")
+        in_flight = {}  # future -> (name, stamp)
+        closed = set()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while is_cancelled is None or not is_cancelled():
+                busy = {name for name, _ in in_flight.values()}
+                for name, stamp in self.ready(closed).items():
+                    if name not in busy:
+                        in_flight[executor.submit(self.parse_file, name, is_cancelled)] = (name, stamp)
+                closed = set()
+
+                if in_flight:
+                    done, _ = wait(in_flight, timeout=0 if inotify else self.poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name, stamp = in_flight.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            self.mark(name, stamp, FAILED)
+                            if on_failed is not None:
+                                on_failed(name, str(e))
+                        else:
+                            if not result['cancelled']:
+                                self.mark(name, stamp, PROCESSED)
+                            if on_finished is not None:
+                                on_finished(result)
+                    if done:
+                        continue
+
+                if inotify is not None:
+                    # Short waits while parses are running so their results are reported promptly
+                    closed = inotify.wait(0.1 if in_flight else self.poll_interval)
+                elif not in_flight:
+                    time.sleep(self.poll_interval)
+        finally:
+            # Queued bundles never start, and running ones see is_cancelled and stop at their next file
+            executor.shutdown(wait=True, cancel_futures=True)
+            if inotify is not None:
+                inotify.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reverse parse bundle files dropped into an inbox folder")
+    parser.add_argument("inbox", help="folder to watch")
+    parser.add_argument("-o", "--output", required=True, help="folder the parsed files are written to")
+    parser.add_argument("-d", "--delimiter", required=True, help="file delimiter; several as '### | <!--:Surround'")
+    parser.add_argument("-t", "--type", dest="delimiter_type", choices=DELIMITER_TYPES, default="Prefix")
+    parser.add_argument("-p", "--pattern", action="append", help="only watch names matching this glob (repeatable)")
+    parser.add_argument("-j", "--jobs", type=int, default=2, help="bundles parsed at the same time")
+    parser.add_argument("--auto-detect", action="store_true",
+                        help="parse a bundle the delimiter finds nothing in with a confidently detected one instead")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds between scans without inotify")
+    parser.add_argument("--db", help="database that records processed bundles (default: .parse_reverse_watch.db in the inbox)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, stream=sys.stderr)
+    db = ParseReverseDatabase(args.db or os.path.join(args.inbox, ".parse_reverse_watch.db"))
+    try:
+        watcher = ParseReverseFolderWatcher(args.inbox, args.output, args.delimiter, args.delimiter_type, db,
+                                            args.pattern, args.jobs, args.poll_interval, args.auto_detect)
+        # One JSON line per bundle on stdout, for whatever feeds the inbox
+        watcher.run(lambda result: print(json.dumps(result), flush=True),
+                    lambda name, message: logging.error(f"{name}: {message}"))
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
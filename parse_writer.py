@@ -0,0 +1,249 @@
+import os
+import locale
+import difflib
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from parse_engine import ParseReverseEngine, ParseReverseStrippedFiles, detect_delimiters, is_blank
+from parse_db import save_parse_run
+from parse_metrics import ParseReverseMetrics, profiled, record_run
+
+# Read the process umask once so new files get the same permissions a plain open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+WRITTEN = "written"
+SKIPPED = "skipped"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Dry-run statuses from compare_file
+NEW = "new"
+UNCHANGED = "unchanged"
+MODIFIED = "modified"
+
+# Minimum detect_delimiters confidence before an auto-detected delimiter is trusted to write files
+AUTO_DETECT_CONFIDENCE = 0.6
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_text(text, encoding=None):
+    """ Encode text to the bytes open(path, 'w').write(text) would have produced """
+    if os.linesep != '\n':
+        text = text.replace('\n', os.linesep)
+    return text.encode(encoding or locale.getpreferredencoding(False))
+
+
+class ParseReverseWriter:
+    """ Writes parsed files on a thread pool, atomically, skipping files whose bytes are already on disk """
+
+    def __init__(self, root, max_workers=None, encoding=None, fsync=False):
+        self.root = root
+        self.real_root = os.path.realpath(root)
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.encoding = encoding
+        self.fsync = fsync
+        self.created_dirs = set()
+        self.dirs_lock = threading.Lock()
+
+    def ensure_dir(self, directory):
+        if not directory or directory in self.created_dirs:
+            return
+        os.makedirs(directory, exist_ok=True)
+        with self.dirs_lock:
+            self.created_dirs.add(directory)
+
+    def target_path(self, filename):
+        """ Where filename is written; raises ValueError for names (.., absolute paths, symlinks) that leave root """
+        file_path = os.path.realpath(os.path.join(self.real_root, filename))
+        if file_path == self.real_root or os.path.commonpath([self.real_root, file_path]) != self.real_root:
+            raise ValueError(f"Refusing to write outside {self.root}: {filename}")
+        return file_path
+
+    def is_unchanged(self, file_path, data):
+        try:
+            if os.path.getsize(file_path) != len(data):
+                return False
+            with open(file_path, 'rb') as f:
+                return content_hash(f.read()) == content_hash(data)
+        except OSError:
+            return False
+
+    def write_file(self, filename, text, is_cancelled=None):
+        """ Write one file and return (status, filename, error) """
+        if is_cancelled is not None and is_cancelled():
+            return CANCELLED, filename, None
+        temp_path = None
+        try:
+            file_path = self.target_path(filename)
+            data = encode_text(text, self.encoding)
+            if self.is_unchanged(file_path, data):
+                return SKIPPED, filename, None
+
+            directory = os.path.dirname(file_path)
+            self.ensure_dir(directory)
+            fd, temp_path = tempfile.mkstemp(dir=directory or None, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            try:
+                mode = os.stat(file_path).st_mode & 0o7777
+            except OSError:
+                mode = 0o666 & ~_UMASK
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, file_path)
+            temp_path = None
+            return WRITTEN, filename, None
+        except Exception as e:
+            return FAILED, filename, str(e)
+        finally:
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def compare_file(self, filename, text, is_cancelled=None):
+        """ Report what write_file would do as (status, filename, error), reading the file only when the sizes match """
+        if is_cancelled is not None and is_cancelled():
+            return CANCELLED, filename, None
+        try:
+            file_path = self.target_path(filename)
+            if not os.path.exists(file_path):
+                return NEW, filename, None
+            return (UNCHANGED if self.is_unchanged(file_path, encode_text(text, self.encoding)) else MODIFIED), filename, None
+        except Exception as e:
+            return FAILED, filename, str(e)
+
+    def write_files(self, files, progress=None, is_cancelled=None):
+        """
+        Write {filename: text} and return a summary dict of written, skipped, failed and cancelled filenames.
+        progress(done, total) is called from the calling thread as files complete.
+        """
+        return self.map_files(self.write_file, files, (WRITTEN, SKIPPED, FAILED, CANCELLED), progress, is_cancelled)
+
+    def compare_files(self, files, progress=None, is_cancelled=None):
+        """ Like write_files, but only sorts {filename: text} into new, unchanged, modified, failed and cancelled """
+        return self.map_files(self.compare_file, files, (NEW, UNCHANGED, MODIFIED, FAILED, CANCELLED), progress, is_cancelled)
+
+    def map_files(self, func, files, statuses, progress, is_cancelled):
+        summary = {status: [] for status in statuses}
+        total = len(files)
+        if not total:
+            return summary
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Texts are fetched on the worker, so a lazy mapping only materialises the files being written right now
+            futures = [executor.submit(lambda filename=filename: func(filename, files[filename], is_cancelled)) for filename in files]
+            for done, future in enumerate(as_completed(futures), 1):
+                status, filename, error = future.result()
+                summary[status].append((filename, error) if status == FAILED else filename)
+                if progress is not None:
+                    progress(done, total)
+        return summary
+
+
+def file_diff(root, filename, text, encoding=None):
+    """ Unified diff lines (no line endings) from the file on disk, or an empty file, to the text a parse would write """
+    file_path = ParseReverseWriter(root).target_path(filename)
+    try:
+        with open(file_path, encoding=encoding or locale.getpreferredencoding(False), errors='replace') as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = ""
+    return list(difflib.unified_diff(current.splitlines(), text.splitlines(), fromfile=f"a/{filename}", tofile=f"b/{filename}",
+                                     lineterm=''))
+
+
+def select_files(files, selected_files=None):
+    """ The selected (default: all) filenames and a lazy {filename: text as it would be written} of the non-empty ones """
+    selected = list(files) if selected_files is None else [filename for filename in selected_files if filename in files]
+    return selected, ParseReverseStrippedFiles(files, [filename for filename in selected if not is_blank(files, filename)])
+
+
+def diff_to_disk(content, path, delimiter, delimiter_type, selected_files=None, files=None, progress=None, is_cancelled=None):
+    """
+    Dry run of reverse_parse_to_disk: sort the selected files into new, unchanged and modified compared with path
+    without writing anything. The result carries the texts under 'files' so file_diff can be run on demand.
+    """
+    if files is None:
+        files = ParseReverseEngine(delimiter, delimiter_type).spans(content)
+    if not files:
+        raise ValueError("No files were detected in the content")
+    selected, to_write = select_files(files, selected_files)
+    summary = ParseReverseWriter(path).compare_files(to_write, progress=progress, is_cancelled=is_cancelled)
+    return {
+        'path': path,
+        'delimiter': delimiter,
+        'delimiter_type': delimiter_type,
+        'detected': len(files),
+        'selected': len(selected),
+        'new': sorted(summary[NEW]),
+        'unchanged': sorted(summary[UNCHANGED]),
+        'modified': sorted(summary[MODIFIED]),
+        'failed': summary[FAILED],
+        'cancelled': bool(summary[CANCELLED]),
+        'files': to_write
+    }
+
+
+def reverse_parse_to_disk(content, path, delimiter, delimiter_type, selected_files=None, db=None, files=None,
+                          progress=None, is_cancelled=None, auto_detect=False, metrics=None):
+    """
+    Parse a bundle, write the selected (default: all) non-empty files under path and record the run in db.
+    files may carry an existing parse of content. With auto_detect, a bundle the given delimiter finds nothing in
+    is parsed with the best detected delimiter instead. Stage timings and counters go into metrics (a new
+    ParseReverseMetrics by default), which is also kept in the recent runs. Returns a result dict for the UI or caller.
+    """
+    if metrics is None:
+        metrics = ParseReverseMetrics("parse")
+    try:
+        with profiled("parse"):
+            metrics.count("bytes", len(content))
+            with metrics.stage("scan"):
+                if files is None:
+                    files = ParseReverseEngine(delimiter, delimiter_type).spans(content)
+                if not files and auto_detect:
+                    candidates = detect_delimiters(content, top_n=1)
+                    if candidates and candidates[0]['confidence'] >= AUTO_DETECT_CONFIDENCE:
+                        delimiter, delimiter_type = candidates[0]['delimiter'], candidates[0]['type']
+                        files = ParseReverseEngine(delimiter, delimiter_type).spans(content)
+            if not files:
+                raise ValueError("No files were detected in the content")
+
+            selected, to_write = select_files(files, selected_files)
+
+            with metrics.stage("write"):
+                summary = ParseReverseWriter(path).write_files(to_write, progress=progress, is_cancelled=is_cancelled)
+            metrics.count("files", len(summary[WRITTEN]))
+            metrics.count("skipped", len(summary[SKIPPED]))
+            metrics.count("errors", len(summary[FAILED]))
+
+            if db is not None:
+                with metrics.stage("db"):
+                    with db.transaction() as conn:
+                        save_parse_run(conn, path, to_write.subset(summary[WRITTEN] + summary[SKIPPED]))
+    except Exception:
+        metrics.count("errors")
+        raise
+    finally:
+        record_run(metrics)
+
+    return {
+        'path': path,
+        'delimiter': delimiter,
+        'delimiter_type': delimiter_type,
+        'detected': len(files),
+        'selected': len(selected),
+        'written': len(summary[WRITTEN]),
+        'skipped': len(summary[SKIPPED]),
+        'failed': summary[FAILED],
+        'cancelled': bool(summary[CANCELLED]),
+        'metrics': metrics.as_dict()
+    }
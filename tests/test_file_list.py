@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from main import ParseReverseFileListModel, diff_names
+
+
+def apply_changes(old_names, new_names, changes):
+    names = list(old_names)
+    for i1, i2, j1, j2 in reversed(changes):
+        names[i1:i2] = new_names[j1:j2]
+    return names
+
+
+def test_diff_names_patches_old_into_new():
+    old_names = ["a.py", "b.py", "c.py", "d.py"]
+    new_names = ["a.py", "x.py", "c.py", "y.py", "z.py"]
+    assert apply_changes(old_names, new_names, diff_names(old_names, new_names)) == new_names
+
+
+def test_diff_names_reports_reordering():
+    assert diff_names(["a.py", "b.py"], ["b.py", "a.py"]) is None
+
+
+def test_large_interleaved_change_is_fast_and_keeps_check_state():
+    old_names = [f"old/{i}.py" for i in range(20000)]
+    kept = old_names[::2]
+    new_names = [name for pair in zip(kept, (f"new/{i}.py" for i in range(len(kept)))) for name in pair]
+    model = ParseReverseFileListModel()
+    model.set_files(dict.fromkeys(old_names, ""))
+    model.unchecked.add(kept[10])
+
+    started = time.perf_counter()
+    model.set_files(dict.fromkeys(new_names, ""))
+    assert time.perf_counter() - started < 1.0
+
+    assert model.names == new_names
+    assert kept[10] not in model.checked_files()
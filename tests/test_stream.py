@@ -0,0 +1,35 @@
+import io
+
+from parse_cli import read_bundle
+from parse_engine import ParseReverseEngine, ParseReverseStreamParser
+from parse_stream import decode_chunks
+
+# Old Mac line endings, Windows line endings and a stray \r inside a line
+BUNDLE = b"### a.py\rfirst\rsecond\r\n### b.py\r\nx = 1\r\ny = '\r'\n### c.txt\nlast\r"
+
+
+def stream_files(data, size):
+    files = {}
+    parser = ParseReverseStreamParser("###")
+    for chunk in decode_chunks(io.BytesIO(data).read, size=size):
+        files.update(parser.feed(chunk))
+    files.update(parser.close())
+    return files
+
+
+def test_decode_chunks_normalises_line_endings_like_text_mode(tmp_path):
+    path = tmp_path / "bundle.txt"
+    path.write_bytes(BUNDLE)
+    expected = read_bundle(path, 'utf-8')
+    assert '\r' not in expected
+    for size in (1, 2, 3, len(BUNDLE)):
+        assert ''.join(decode_chunks(io.BytesIO(BUNDLE).read, size=size)) == expected
+
+
+def test_streamed_bundle_parses_like_the_bundle_file(tmp_path):
+    path = tmp_path / "bundle.txt"
+    path.write_bytes(BUNDLE)
+    expected = ParseReverseEngine("###").parse(read_bundle(path, 'utf-8'))
+    assert set(expected) == {"a.py", "b.py", "c.txt"}
+    for size in (1, 2, 5, len(BUNDLE)):
+        assert stream_files(BUNDLE, size) == expected